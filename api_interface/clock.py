@@ -0,0 +1,86 @@
+from typing import Optional
+import datetime
+import threading
+import time
+
+
+class Clock:
+    """
+    Source of time for everything that needs to know "now" or has to wait (e.g. rate limiters).
+    Subclasses need to implement `now()` and `sleep()`.
+    """
+
+    def now(self) -> datetime.datetime:
+        """
+        Returns:
+            datetime.datetime: the current time according to this clock.
+        """
+        raise NotImplementedError("This method needs to be implemented by subclass!")
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Waits for [seconds] according to this clock.
+        """
+        raise NotImplementedError("This method needs to be implemented by subclass!")
+
+
+class SystemClock(Clock):
+    """
+    The real wall clock.
+    """
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds and seconds > 0.0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    A clock that only moves when told to: `sleep()` returns immediately and advances the clock instead.
+    Used to simulate (multi-hour) crawls and to test time-dependent behaviour in milliseconds.
+
+    Args:
+        start (Optional[datetime.datetime], optional): the initial time. Defaults to None (2000-01-01).
+    """
+
+    def __init__(self, start: Optional[datetime.datetime] = None) -> None:
+        self.start = start or datetime.datetime(2000, 1, 1)
+        self._now = self.start
+        # may be shared by several (simulated) workers
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds passed since `start`.
+        """
+        return (self._now - self.start).total_seconds()
+
+    def now(self) -> datetime.datetime:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds and seconds > 0.0:
+            self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """
+        Moves the clock forward by [seconds].
+        """
+        with self._lock:
+            self._now += datetime.timedelta(seconds=seconds)
+
+    def set(self, new_now: datetime.datetime) -> None:
+        """
+        Moves the clock to [new_now] (never backwards).
+        """
+        with self._lock:
+            if new_now > self._now:
+                self._now = new_now
+
+
+# default clock for all time-dependent components
+system_clock = SystemClock()
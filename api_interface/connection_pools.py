@@ -0,0 +1,155 @@
+from typing import Dict, Optional
+from collections import namedtuple
+from urllib.parse import urlsplit
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from riotwatcher import LolWatcher
+from riotwatcher.Handlers import RequestHandler
+
+# seconds before a request (connect or read) is given up on
+DEFAULT_TIMEOUT_SECONDS = 10.0
+
+HostStats = namedtuple(
+    "HostStats",
+    ("n_requests", "n_connections", "connection_reuse", "mean_latency_seconds", "bytes_received"),
+)
+
+
+class _HostPool:
+    """
+    Persistent `requests.Session` (and its connection pool) for a single host.
+    """
+
+    def __init__(self, pool_maxsize: int) -> None:
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+        # retries are handled by the crawl layer (see `resilience`), not by urllib3
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0, pool_block=True
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.n_requests = 0
+        self.total_latency = 0.0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def n_connections(self) -> int:
+        """
+        Amount of connections (i.e. DNS lookups + TCP/TLS handshakes) opened so far.
+        """
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def record(self, latency: float, response: requests.Response) -> None:
+        with self._lock:
+            self.n_requests += 1
+            self.total_latency += latency
+            self.bytes_received += int(response.headers.get("Content-Length", 0) or 0)
+
+
+class RegionalConnectionPools(RequestHandler):
+    """
+    Riotwatcher request handler that sends every request through a persistent, keep-alive connection pool
+    of its regional host (`euw1.api.riotgames.com`, `na1.api.riotgames.com`, ...), instead of opening
+    a new connection (DNS lookup, TCP & TLS handshake) for each request.
+    Responses are requested gzip-compressed.
+
+    Install it on a `LolWatcher` with `install()`: it is appended to the end of the handler chain,
+    so all other handlers (rate limiting, error handling, deserialization) still apply.
+
+    Args:
+        pool_maxsize (int, optional): connections kept per host; match it to the concurrency
+            the rate limiters allow per region. Defaults to 1.
+        timeout (Optional[float], optional): timeout of a request in seconds. Defaults to 10.0.
+            > a hung connection raises `requests.Timeout` (retriable) instead of stalling its region forever.
+    """
+
+    def __init__(
+        self, pool_maxsize: Optional[int] = 1, timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS
+    ) -> None:
+        super().__init__()
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.api_key = None
+        self._pools: Dict[str, _HostPool] = {}
+        self._lock = threading.Lock()
+
+    def install(self, lolwatcher: LolWatcher) -> LolWatcher:
+        """
+        Routes all requests of [lolwatcher] through these connection pools.
+
+        Returns:
+            LolWatcher: the same lolwatcher (for chaining).
+        """
+        # NOTE(riotwatcher 3.1.1): there's no public hook for the transport, but a handler whose
+        # `preview_request` returns a response short-circuits the default `requests.get`.
+        base_api = lolwatcher._base_api
+        self.api_key = base_api.api_key
+        if self not in base_api._request_handlers:
+            base_api._request_handlers.append(self)
+        return lolwatcher
+
+    def pool_for(self, url: str) -> _HostPool:
+        """
+        Returns (and lazily creates) the connection pool of the host of [url].
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._pools:
+                self._pools[host] = _HostPool(pool_maxsize=self.pool_maxsize)
+            return self._pools[host]
+
+    def preview_request(
+        self, region: str, endpoint_name: str, method_name: str, url: str, query_params: dict
+    ) -> requests.Response:
+        pool = self.pool_for(url)
+        start = time.perf_counter()
+        response = pool.session.get(
+            url, params=query_params, headers={"X-Riot-Token": self.api_key}, timeout=self.timeout
+        )
+        pool.record(latency=time.perf_counter() - start, response=response)
+        return response
+
+    def stats(self) -> Dict[str, HostStats]:
+        """
+        Returns:
+            Dict[str, HostStats]: per host: requests made, connections opened, share of requests
+                that reused a connection, mean latency and (compressed) bytes received.
+        """
+        stats = {}
+        for host, pool in self._pools.items():
+            n_connections = pool.n_connections()
+            stats[host] = HostStats(
+                n_requests=pool.n_requests,
+                n_connections=n_connections,
+                connection_reuse=1 - n_connections / pool.n_requests if pool.n_requests else 0.0,
+                mean_latency_seconds=pool.total_latency / pool.n_requests if pool.n_requests else 0.0,
+                bytes_received=pool.bytes_received,
+            )
+        return stats
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        for pool in self._pools.values():
+            pool.session.close()
+        self._pools = {}
+
+
+def pooled_lolwatcher(
+    api_key: str,
+    pool_maxsize: Optional[int] = 1,
+    timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+) -> LolWatcher:
+    """
+    Shortcut to create a `LolWatcher` whose requests go through `RegionalConnectionPools`.
+    The pools are available as `lolwatcher.connection_pools` (e.g. for `stats()`).
+    """
+    connection_pools = RegionalConnectionPools(pool_maxsize=pool_maxsize, timeout=timeout)
+    lolwatcher = connection_pools.install(LolWatcher(api_key, timeout=timeout))
+    lolwatcher.connection_pools = connection_pools
+    return lolwatcher
@@ -0,0 +1,111 @@
+from typing import List, Iterable, Optional, Dict
+from collections import namedtuple
+import math
+from utils.enums import RankedQueue, Server
+from utils.distributions.rank_distributions import (
+    _RankedDistribution,
+    TotalDistribution as TotalRankedDistribution,
+)
+from utils.distributions.server_distributions import (
+    ServerDistribution,
+    TotalDistribution as TotalServerDistribution,
+)
+
+# amount of entries the Riot API `GET getLeagueEntries` endpoint returns per (full) page
+ENTRIES_PER_PAGE = 205
+
+CrawlCell = namedtuple(
+    "CrawlCell", ("server", "ranked_queue", "tier", "division", "n_entries", "n_pages")
+)
+
+
+def _largest_remainder(n_total: int, shares: Dict[tuple, float]) -> Dict[tuple, int]:
+    """
+    Splits [n_total] according to [shares] into integers that sum up to exactly [n_total].
+    """
+    total_share = sum(shares.values())
+    exact = {k: n_total * share / total_share for k, share in shares.items()}
+    counts = {k: math.floor(v) for k, v in exact.items()}
+    by_remainder = sorted(exact, key=lambda k: exact[k] - counts[k], reverse=True)
+    for k in by_remainder[: n_total - sum(counts.values())]:
+        counts[k] += 1
+    return counts
+
+
+def plan_crawl(
+    n_total: int,
+    ranked_queue: Optional[RankedQueue] = RankedQueue.SOLO_DUO,
+    server_distribution: Optional[ServerDistribution] = TotalServerDistribution,
+    ranked_distribution: Optional[Iterable[_RankedDistribution]] = TotalRankedDistribution,
+    servers: Optional[Iterable[Server]] = None,
+    page_size: Optional[int] = ENTRIES_PER_PAGE,
+) -> List[CrawlCell]:
+    """
+    Splits a target of [n_total] players over (server x tier x division) cells, according to the distributions.
+    The amount of entries of all cells adds up to exactly [n_total].
+
+    Args:
+        n_total (int): total amount of players to fetch.
+        ranked_queue (Optional[RankedQueue], optional): queue to crawl. Defaults to RankedQueue.SOLO_DUO.
+        server_distribution (Optional[ServerDistribution], optional): Defaults to the static server distribution.
+        ranked_distribution (Optional[Iterable[_RankedDistribution]], optional): Defaults to the static rank distribution.
+        servers (Optional[Iterable[Server]], optional): only crawl these servers. Defaults to None (all).
+        page_size (Optional[int], optional): entries per page, to derive the amount of requests. Defaults to 205.
+
+    Returns:
+        List[CrawlCell]: one cell per (server, tier, division) with at least one entry to fetch.
+    """
+    servers = list(servers) if servers is not None else list(Server)
+    shares = {}
+    for server in servers:
+        server_share = getattr(server_distribution, server.name, 0.0)
+        for distribution in ranked_distribution:
+            for division, division_share in distribution.distribution.items():
+                shares[(server, distribution.tier, division)] = server_share * division_share
+
+    cells = []
+    for (server, tier, division), n_entries in _largest_remainder(n_total, shares).items():
+        if n_entries:
+            cells.append(
+                CrawlCell(
+                    server=server,
+                    ranked_queue=ranked_queue,
+                    tier=tier,
+                    division=division,
+                    n_entries=n_entries,
+                    n_pages=math.ceil(n_entries / page_size),
+                )
+            )
+    return cells
+
+
+def max_probe_requests(n_pages: int) -> int:
+    """
+    Upper bound of the requests a `division_probe.DivisionProbe` makes for a division of [n_pages] pages
+    (exponential + binary phase, incl. the first empty page).
+    """
+    return 2 * math.ceil(math.log2(max(n_pages, 1))) + 2
+
+
+def estimate_probe_requests(
+    cell: CrawlCell,
+    server_distribution: Optional[ServerDistribution] = TotalServerDistribution,
+    ranked_distribution: Optional[Iterable[_RankedDistribution]] = TotalRankedDistribution,
+    page_size: Optional[int] = ENTRIES_PER_PAGE,
+) -> int:
+    """
+    Requests needed to probe the size of a cell's division (see `division_probe`) before sampling it,
+    based on the division's population estimated from the distributions.
+
+    Returns:
+        int: upper bound of the probe requests.
+    """
+    division_share = next(
+        (d.distribution.get(cell.division, 0.0) for d in ranked_distribution if d.tier == cell.tier), 0.0
+    )
+    population = (
+        server_distribution.total_population
+        * getattr(server_distribution, cell.server.name, 0.0)
+        * division_share
+    )
+    return max_probe_requests(max(math.ceil(population / page_size), cell.n_pages))
@@ -0,0 +1,127 @@
+from typing import Iterable, Tuple, Union, Callable, Optional
+from collections import namedtuple, defaultdict
+import heapq
+import datetime
+from .clock import VirtualClock
+from .rate_limiters import RateLimiterCollection
+from utils.enums import Server
+
+SimulationReport = namedtuple(
+    "SimulationReport",
+    (
+        # predicted wall time of the whole crawl (slowest server)
+        "runtime_seconds",
+        "n_requests",
+        # per server: predicted wall time, time spent waiting on the limiters, time spent in requests
+        "runtime_per_server",
+        "idle_seconds",
+        "busy_seconds",
+        # per server: the limiter responsible for most of the idle time (None if it never had to wait)
+        "bottleneck",
+    ),
+)
+
+
+class CrawlSimulator:
+    """
+    Discrete-event simulation of a crawl against a rate limiter configuration, on a `VirtualClock`.
+    Every server is crawled sequentially (one request at a time, like an `EntryFetcher`) with its own
+    copy of the limiters (Riot rate limits are enforced per region), while servers run concurrently.
+
+    Args:
+        rate_limiters (RateLimiterCollection): limiter configuration, e.g. `ProductionKeyRateLimiters`.
+            > never used directly, every simulated server gets a fresh copy.
+        latency (Union[float, Callable[[Server], float]], optional): (fake) duration of a single request in seconds,
+            either constant or per server. Defaults to 0.1.
+    """
+
+    def __init__(
+        self,
+        rate_limiters: RateLimiterCollection,
+        latency: Optional[Union[float, Callable[[Server], float]]] = 0.1,
+    ) -> None:
+        self.rate_limiters = rate_limiters
+        self.latency = latency if callable(latency) else (lambda server: latency)
+
+    def simulate(self, plan: Iterable[Tuple[Server, int]]) -> SimulationReport:
+        """
+        Replays a crawl plan.
+
+        Args:
+            plan (Iterable[Tuple[Server, int]]): (server, amount of requests) pairs, e.g. one per
+                (server x tier x division) cell with its amount of pages. Pairs of the same server are summed up.
+
+        Returns:
+            SimulationReport: predicted runtime, limiter idle time and bottleneck limits.
+        """
+        requests_left = defaultdict(int)
+        for server, n_requests in plan:
+            requests_left[server] += n_requests
+        n_requests = sum(requests_left.values())
+
+        clock = VirtualClock()
+        limiters = {server: self.rate_limiters.copy(clock=clock) for server in requests_left}
+        idle = defaultdict(float)
+        busy = defaultdict(float)
+        finished_at = {}
+        # per server: {limiter description: idle time it caused}
+        idle_by_limiter = defaultdict(lambda: defaultdict(float))
+
+        # event queue of (time, server name, is_invoke, server)
+        # > a "ready" event asks the limiters how long to wait, an "invoke" event makes the request.
+        # all events are processed in time order, so the shared virtual clock never moves backwards.
+        events = [
+            (clock.now(), server.value, False, server) for server, n in requests_left.items() if n > 0
+        ]
+        heapq.heapify(events)
+        while events:
+            event_time, _, is_invoke, server = heapq.heappop(events)
+            clock.set(event_time)
+            server_limiters = limiters[server]
+            if not is_invoke:
+                wait_for = server_limiters.get_wait_time()
+                if wait_for:
+                    idle[server] += wait_for
+                    idle_by_limiter[server][str(server_limiters.get_bottleneck())] += wait_for
+                    heapq.heappush(events, (event_time + _delta(wait_for), server.value, True, server))
+                    continue
+
+            # make the (simulated) request
+            server_limiters.last_invoked = clock.now()
+            latency = self.latency(server)
+            busy[server] += latency
+            requests_left[server] -= 1
+            done_at = clock.now() + _delta(latency)
+            if requests_left[server]:
+                heapq.heappush(events, (done_at, server.value, False, server))
+            else:
+                finished_at[server] = (done_at - clock.start).total_seconds()
+
+        return SimulationReport(
+            runtime_seconds=max(finished_at.values(), default=0.0),
+            n_requests=n_requests,
+            runtime_per_server=finished_at,
+            idle_seconds=dict(idle),
+            busy_seconds=dict(busy),
+            bottleneck={
+                server: max(idle_by_limiter[server], key=idle_by_limiter[server].get)
+                if idle_by_limiter[server]
+                else None
+                for server in finished_at
+            },
+        )
+
+
+def _delta(seconds: float) -> datetime.timedelta:
+    return datetime.timedelta(seconds=seconds)
+
+
+def simulate_crawl(
+    plan: Iterable[Tuple[Server, int]],
+    rate_limiters: RateLimiterCollection,
+    latency: Optional[Union[float, Callable[[Server], float]]] = 0.1,
+) -> SimulationReport:
+    """
+    Shortcut for `CrawlSimulator(...).simulate(plan)`.
+    """
+    return CrawlSimulator(rate_limiters=rate_limiters, latency=latency).simulate(plan)
@@ -0,0 +1,105 @@
+from typing import Dict, Optional
+from collections import namedtuple
+from .league_entries import EntryFetcher
+from .rate_limiters import RateLimiterCollection
+
+DivisionSize = namedtuple("DivisionSize", ("last_page", "page_size", "n_entries", "n_requests"))
+
+
+class DivisionProbe:
+    """
+    Finds the last non-empty page of a (server, queue, tier, division) in O(log pages) requests.
+    The page number is doubled until an empty page is hit, then the last non-empty page is binary-searched.
+    Uses `EntryFetcher.fetch_next_page(page=...)`, so the iteration state of the fetcher is left untouched.
+
+    Args:
+        entry_fetcher (EntryFetcher): Fetcher describing the (server, queue, tier, division) to probe.
+        rate_limiters (Optional[RateLimiterCollection], optional): If provided, waits on it before every request.
+            Defaults to None.
+    """
+
+    def __init__(
+        self, entry_fetcher: EntryFetcher, rate_limiters: Optional[RateLimiterCollection] = None
+    ) -> None:
+        self.entry_fetcher = entry_fetcher
+        self.rate_limiters = rate_limiters
+        # page -> amount of entries on that page (every page is fetched at most once)
+        self._page_sizes: Dict[int, int] = {}
+
+    @property
+    def n_requests(self) -> int:
+        return len(self._page_sizes)
+
+    def _page_size(self, page: int) -> int:
+        """
+        Fetches (or looks up) the amount of entries on a given page.
+
+        Args:
+            page (int): page number to fetch (1-indexed).
+
+        Returns:
+            int: amount of entries on that page.
+        """
+        if page not in self._page_sizes:
+            if self.rate_limiters is not None:
+                self.rate_limiters.wait()
+            self._page_sizes[page] = len(self.entry_fetcher.fetch_next_page(page=page))
+        return self._page_sizes[page]
+
+    def probe(self) -> DivisionSize:
+        """
+        Runs the exponential + binary search.
+        A page that holds fewer entries than the first page is known to be the last one,
+        which short-circuits the search.
+
+        Returns:
+            DivisionSize: (last_page, page_size, n_entries, n_requests). `last_page` is 0 for an empty division.
+        """
+        full_page_size = self._page_size(1)
+        if not full_page_size:
+            return DivisionSize(last_page=0, page_size=0, n_entries=0, n_requests=self.n_requests)
+
+        # exponential phase: `lo` is always non-empty, `hi` is always empty
+        lo, hi = 1, 2
+        while self._page_size(lo) == full_page_size:
+            if not self._page_size(hi):
+                break
+            lo, hi = hi, hi * 2
+        else:
+            # `lo` is a partially filled page > must be the last one
+            return self._result(last_page=lo, page_size=full_page_size)
+
+        # binary phase
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if not self._page_size(mid):
+                hi = mid
+            else:
+                lo = mid
+                if self._page_size(mid) < full_page_size:
+                    break
+        return self._result(last_page=lo, page_size=full_page_size)
+
+    def _result(self, last_page: int, page_size: int) -> DivisionSize:
+        return DivisionSize(
+            last_page=last_page,
+            page_size=page_size,
+            n_entries=(last_page - 1) * page_size + self._page_size(last_page),
+            n_requests=self.n_requests,
+        )
+
+
+def estimate_division_size(
+    entry_fetcher: EntryFetcher, rate_limiters: Optional[RateLimiterCollection] = None
+) -> DivisionSize:
+    """
+    Shortcut for `DivisionProbe(...).probe()`.
+
+    Args:
+        entry_fetcher (EntryFetcher): Fetcher describing the (server, queue, tier, division) to probe.
+        rate_limiters (Optional[RateLimiterCollection], optional): Rate limiters to respect. Defaults to None.
+
+    Returns:
+        DivisionSize: (last_page, page_size, n_entries, n_requests)
+    """
+    return DivisionProbe(entry_fetcher=entry_fetcher, rate_limiters=rate_limiters).probe()
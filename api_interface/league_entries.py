@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional
 import os
 from riotwatcher import LolWatcher
 from utils.enums import Tier, Division, RankedQueue, Server
+from utils.profiling import profiled
 
 
 class EntryFetcher:
@@ -15,6 +16,8 @@ class EntryFetcher:
         ranked_queue (RankedQueue): RankedQueue enum member (e.g. RankedQueue.RANKED_SOLO_DUO_5x5).
         server (Server): Server enum member (e.g. Server.EUW).
         max_entries (int, optional): Optional amount of max individual(!) entries to fetch before stopping iteration. Defaults to 0.
+        page_log (RawPageLog, optional): If provided, every page of the iteration is appended to it. Defaults to None.
+            > the raw page is logged with the indices of the entries that were kept (see `data.raw_page_log`).
     """
 
     def __init__(
@@ -25,6 +28,7 @@ class EntryFetcher:
         ranked_queue: RankedQueue,
         server: Server,
         max_entries: Optional[int] = 0,
+        page_log=None,
     ) -> None:
         """
         Initializes an iterable EndpointFetcher for the Riot `getEntries` LoL API.
@@ -36,21 +40,58 @@ class EntryFetcher:
         self.server = server
         assert max_entries >= 0, f"`max_entries` cannot be below 0!"
         self.max_entries = max_entries
+        self.page_log = page_log
         self.current_page = 1
         self.entries_fetched = 0
 
-    def fetch_next_page(self) -> List[Dict[str, Any]]:
+    @profiled("fetch")
+    def fetch_next_page(self, page: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Fetches data for `self.current_page` from Riot getEntries API.
+
+        Args:
+            page (Optional[int], optional): Fetch this page instead of `self.current_page`. Defaults to None.
+                > does not move the iteration forward, useful for probing arbitrary pages.
         """
+        page = self.current_page if page is None else page
         return self.lolwatcher.league.entries(
             region=self.server.value,
             queue=self.ranked_queue.value,
             tier=self.tier.value,
             division=self.division.value,
-            page=self.current_page,
+            page=page,
         )
 
+    def log_page(
+        self, page: int, entries: List[Dict[str, Any]], kept: Optional[List[int]] = None
+    ) -> None:
+        """
+        Appends a fetched page to the `page_log` (if any).
+        Must be called before the entries are converted to table instances (which mutates them!).
+
+        Args:
+            page (int): page number.
+            entries (List[Dict[str, Any]]): the untouched response.
+            kept (Optional[List[int]], optional): indices of the entries that were kept. Defaults to None (all).
+        """
+        if self.page_log is not None:
+            self.page_log.write_page(
+                server=self.server,
+                ranked_queue=self.ranked_queue,
+                tier=self.tier,
+                division=self.division,
+                page=page,
+                entries=entries,
+                kept=kept,
+            )
+
+    @property
+    def exhausted(self) -> bool:
+        """
+        Whether the iteration is known to be over without making another request (`max_entries` reached).
+        """
+        return bool(self.max_entries) and self.entries_fetched >= self.max_entries
+
     def __iter__(self):
         """
         Entry point for iterator.
@@ -73,8 +114,11 @@ class EntryFetcher:
         if self.max_entries and self.entries_fetched >= self.max_entries:
             raise StopIteration
         data = self.fetch_next_page()
+        n_kept = len(data)
         if self.max_entries:
-            data = data[: self.max_entries - self.entries_fetched]
+            n_kept = min(n_kept, self.max_entries - self.entries_fetched)
+        self.log_page(self.current_page, data, kept=list(range(n_kept)) if n_kept < len(data) else None)
+        data = data[:n_kept]
 
         self.entries_fetched += len(data)
         self.current_page += 1
@@ -82,12 +126,16 @@ class EntryFetcher:
         return data
 
 
-# example instance of EntryFetcher (for testing purposes only!)
-_TESTING_PURPOSES_EF_PARAMS = {
-    "lolwatcher": LolWatcher(os.environ.get("X_RIOT_TOKEN")),
-    "tier": Tier.GOLD,
-    "division": Division.FOUR,
-    "ranked_queue": RankedQueue.SOLO_DUO,
-    "server": Server.EUW,
-    "max_entries": 50,
-}
\ No newline at end of file
+def _testing_purposes_ef_params() -> Dict[str, Any]:
+    """
+    Parameters of an example instance of EntryFetcher (for testing purposes only!).
+    Built on demand, so importing this module never instantiates a `LolWatcher`.
+    """
+    return {
+        "lolwatcher": LolWatcher(os.environ.get("X_RIOT_TOKEN")),
+        "tier": Tier.GOLD,
+        "division": Division.FOUR,
+        "ranked_queue": RankedQueue.SOLO_DUO,
+        "server": Server.EUW,
+        "max_entries": 50,
+    }
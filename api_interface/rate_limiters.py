@@ -1,5 +1,7 @@
 from typing import Optional, Tuple, Iterable
 import datetime
+from .clock import Clock, system_clock
+from utils.profiling import profiled
 
 
 # NOTE(jonas): we might also want to have a "greedy" rate limiter
@@ -15,13 +17,20 @@ class RateLimiter:
     Args:
         n_requests (int): the amount of requests you're allowed to make per a given interval
         per_interval (str): given restricting interval. Format: `1seconds`, `20minutes` etc.
+        clock (Optional[Clock], optional): source of the current time. Defaults to None (system clock).
     """
 
-    def __init__(self, n_requests: int, per_interval: str) -> "RateLimiter":
+    def __init__(
+        self, n_requests: int, per_interval: str, clock: Optional[Clock] = None
+    ) -> "RateLimiter":
         self._n_requests = n_requests
         self._per_interval = per_interval
         self.time, self.unit = self.parse_increments(increments=per_interval)
         self._last_invoked = datetime.datetime.min
+        self.clock = clock or system_clock
+
+    def __str__(self) -> str:
+        return f"{self._n_requests} requests per {self._per_interval}"
 
     @property
     def last_invoked(self) -> datetime.datetime:
@@ -78,7 +87,7 @@ class RateLimiter:
         """
         next_invoke_time = self._last_invoked + datetime.timedelta(**{self.unit: self.time})
         should_wait_for = (
-            next_invoke_time - datetime.datetime.now()
+            next_invoke_time - self.clock.now()
         ).total_seconds() / self._n_requests
         if should_wait_for > 0.0:
             return should_wait_for
@@ -91,10 +100,45 @@ class RateLimiterCollection:
 
     Args:
         rate_limiters (Iterable[RateLimiter]): An iterable of `RateLimiter` to manage.
+        clock (Optional[Clock], optional): If provided, set as the clock of all member `RateLimiter`. Defaults to None.
     """
-    def __init__(self, rate_limiters: Iterable[RateLimiter]) -> None:
+
+    def __init__(self, rate_limiters: Iterable[RateLimiter], clock: Optional[Clock] = None) -> None:
         self.rate_limiters = rate_limiters
         self._last_invoked = datetime.datetime.min
+        if clock is not None:
+            for rate_limiter in self.rate_limiters:
+                rate_limiter.clock = clock
+
+    @property
+    def clock(self) -> Clock:
+        """
+        The clock used to wait on (the clock of the first member `RateLimiter`).
+        """
+        for rate_limiter in self.rate_limiters:
+            return rate_limiter.clock
+        return system_clock
+
+    def copy(self, clock: Optional[Clock] = None) -> "RateLimiterCollection":
+        """
+        Creates a fresh (never invoked) collection with the same limits, e.g. one per server.
+
+        Args:
+            clock (Optional[Clock], optional): clock of the copy. Defaults to None (same clock as this collection).
+
+        Returns:
+            RateLimiterCollection: the fresh collection.
+        """
+        return RateLimiterCollection(
+            rate_limiters=tuple(
+                RateLimiter(
+                    n_requests=rl._n_requests,
+                    per_interval=rl._per_interval,
+                    clock=clock or rl.clock,
+                )
+                for rl in self.rate_limiters
+            )
+        )
 
     @property
     def last_invoked(self) -> datetime.datetime:
@@ -140,6 +184,33 @@ class RateLimiterCollection:
         durations = [d for d in durations if d is not None]
         return None if not durations else max(durations)
 
+    def get_bottleneck(self) -> Optional[RateLimiter]:
+        """
+        Returns:
+            Optional[RateLimiter]: the member `RateLimiter` with the longest wait-time, None if no wait is needed.
+        """
+        bottleneck, longest = None, 0.0
+        for rate_limiter in self.rate_limiters:
+            duration = rate_limiter.maybe_get_wait_duration()
+            if duration is not None and duration > longest:
+                bottleneck, longest = rate_limiter, duration
+        return bottleneck
+
+    @profiled("limiter_wait")
+    def wait(self) -> Optional[float]:
+        """
+        Waits (on the clock of the limiters) as long as needed, then marks the call as made.
+        Use this right before making the call you're rate-limiting.
+
+        Returns:
+            Optional[float]: the waited time in seconds, None if there was no need to wait.
+        """
+        wait_for = self.get_wait_time()
+        if wait_for:
+            self.clock.sleep(wait_for)
+        self.last_invoked = self.clock.now()
+        return wait_for
+
 
 # V --------------- Riot API rate limiters --------------- V
 DevelopmentKeyRateLimiters = RateLimiterCollection(
@@ -0,0 +1,357 @@
+from typing import Iterable, Optional, Mapping, Dict, List, Generator, Tuple, Any
+import datetime
+import random
+import enum
+import queue
+import threading
+import requests
+from .clock import Clock, system_clock
+from .league_entries import EntryFetcher
+from .rate_limiters import RateLimiterCollection
+from utils.enums import Server
+from utils.profiling import profiler
+
+
+def is_retriable(error: Exception) -> bool:
+    """
+    Whether a failed request is worth retrying: rate limited (429), server errors (5xx), timeouts & connection errors.
+    Everything else (e.g. 400 bad request, 403 invalid API key) would fail again.
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> float:
+    """
+    Seconds the API asked us to wait via a `Retry-After` header (0 if not present).
+    """
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: the n-th retry waits uniformly in [0, min(cap, base * multiplier^n)].
+
+    Args:
+        base_seconds (float, optional): upper bound of the first delay. Defaults to 1.0.
+        cap_seconds (float, optional): maximum upper bound of any delay. Defaults to 60.0.
+        multiplier (float, optional): growth of the upper bound per attempt. Defaults to 2.0.
+        seed (Optional[int], optional): seed of the jitter. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        base_seconds: Optional[float] = 1.0,
+        cap_seconds: Optional[float] = 60.0,
+        multiplier: Optional[float] = 2.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.base_seconds = base_seconds
+        self.cap_seconds = cap_seconds
+        self.multiplier = multiplier
+        self._random = random.Random(seed)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Args:
+            attempt (int): number of the retry (0 for the first retry).
+
+        Returns:
+            float: seconds to wait before retrying.
+        """
+        upper = min(self.cap_seconds, self.base_seconds * self.multiplier ** attempt)
+        return self._random.uniform(0.0, upper)
+
+
+class BreakerState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a (degraded) region after [failure_threshold] consecutive failures.
+    After [cooldown_seconds], a single trial request is let through (half-open):
+    success closes the breaker again, failure re-opens it for another cooldown.
+
+    Args:
+        failure_threshold (int, optional): consecutive failures before opening. Defaults to 5.
+        cooldown_seconds (float, optional): time to stay open. Defaults to 30.0.
+        clock (Optional[Clock], optional): source of the current time. Defaults to None (system clock).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = 5,
+        cooldown_seconds: Optional[float] = 30.0,
+        clock: Optional[Clock] = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock or system_clock
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = datetime.datetime.min
+        self.times_opened = 0
+
+    @property
+    def available_at(self) -> datetime.datetime:
+        """
+        Earliest time at which a request is let through.
+        """
+        if self.state is BreakerState.OPEN:
+            return self.opened_at + datetime.timedelta(seconds=self.cooldown_seconds)
+        return datetime.datetime.min
+
+    def allow_request(self) -> bool:
+        if self.state is BreakerState.OPEN and self.clock.now() >= self.available_at:
+            self.state = BreakerState.HALF_OPEN
+        return self.state is not BreakerState.OPEN
+
+    def record_success(self) -> None:
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if (
+            self.state is BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = BreakerState.OPEN
+            self.opened_at = self.clock.now()
+            self.times_opened += 1
+
+
+# marks the end of a worker
+_WORKER_DONE = object()
+
+
+class _WorkerError:
+    """
+    Non-retriable error raised within a worker, to be re-raised by the consumer.
+    """
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+class _ScheduledFetcher:
+    """
+    Scheduling state of a single `EntryFetcher` within a `ResilientCrawler`.
+    """
+
+    def __init__(self, fetcher: EntryFetcher) -> None:
+        self.fetcher = fetcher
+        self.not_before = datetime.datetime.min
+        # failed attempts of the current page
+        self.attempts = 0
+
+
+class ResilientCrawler:
+    """
+    Crawls many `EntryFetcher` (typically across servers), so that a failing region
+    neither aborts the run nor holds up healthy regions:
+        > every server is crawled by its own worker thread (its fetchers are interleaved round-robin),
+          so a slow or timing-out region only ever blocks itself,
+        > retriable failures (429, 5xx, timeouts) re-queue the page with jittered exponential backoff,
+        > every server has a `CircuitBreaker`, an open breaker only pauses the fetchers of that server,
+        > a page that exhausts its retry budget gives up its fetcher (see `failed`), the rest keeps running.
+    Non-retriable errors (e.g. an invalid API key) stop all workers and are raised.
+    Fetched pages are handed to the iterating (single) consumer through a bounded queue.
+
+    Args:
+        fetchers (Iterable[EntryFetcher]): the fetchers to crawl.
+        rate_limiters (Optional[Mapping[Server, RateLimiterCollection]], optional): limiters per server. Defaults to None.
+        clock (Optional[Clock], optional): clock to wait on. Defaults to None (system clock).
+        backoff (Optional[Backoff], optional): retry delays. Defaults to None (`Backoff()`).
+        max_retries_per_page (int, optional): retry budget of a single page. Defaults to 5.
+        failure_threshold (int, optional): consecutive failures of a server that open its breaker. Defaults to 5.
+        cooldown_seconds (float, optional): time a server's breaker stays open. Defaults to 30.0.
+        max_pending_pages (int, optional): fetched pages waiting for the consumer before workers pause. Defaults to 64.
+    """
+
+    def __init__(
+        self,
+        fetchers: Iterable[EntryFetcher],
+        rate_limiters: Optional[Mapping[Server, RateLimiterCollection]] = None,
+        clock: Optional[Clock] = None,
+        backoff: Optional[Backoff] = None,
+        max_retries_per_page: Optional[int] = 5,
+        failure_threshold: Optional[int] = 5,
+        cooldown_seconds: Optional[float] = 30.0,
+        max_pending_pages: Optional[int] = 64,
+    ) -> None:
+        self.clock = clock or system_clock
+        self.rate_limiters = rate_limiters or {}
+        self.backoff = backoff or Backoff()
+        self.max_retries_per_page = max_retries_per_page
+        self.max_pending_pages = max_pending_pages
+        self.breakers: Dict[Server, CircuitBreaker] = {}
+        # scheduling queue (round-robin) per server
+        self._scheduled: Dict[Server, List[_ScheduledFetcher]] = {}
+        for fetcher in fetchers:
+            self._scheduled.setdefault(fetcher.server, []).append(_ScheduledFetcher(fetcher))
+            if fetcher.server not in self.breakers:
+                self.breakers[fetcher.server] = CircuitBreaker(
+                    failure_threshold=failure_threshold,
+                    cooldown_seconds=cooldown_seconds,
+                    clock=self.clock,
+                )
+        # fetchers that exhausted their retry budget, with the last error
+        self.failed: List[Tuple[EntryFetcher, Exception]] = []
+        self.n_retries = 0
+        # per server: earliest time its limiters allow the next request (asked once after every request)
+        self._limiter_not_before: Dict[Server, datetime.datetime] = {
+            server: datetime.datetime.min for server in self._scheduled
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _ready_at(self, scheduled: _ScheduledFetcher) -> datetime.datetime:
+        """
+        Earliest time at which a fetcher may make its next request (backoff, breaker & rate limits).
+        """
+        server = scheduled.fetcher.server
+        return max(
+            scheduled.not_before, self.breakers[server].available_at, self._limiter_not_before[server]
+        )
+
+    def _schedule_limiters(self, server: Server) -> None:
+        """
+        Asks the limiters of [server] (once, right after a request) how long to wait before its next request.
+        The wait is spread over the limiters' interval, so it has to be asked once and kept, not re-polled
+        (like `RateLimiterCollection.wait()`).
+        """
+        if server in self.rate_limiters:
+            wait_for = self.rate_limiters[server].get_wait_time() or 0.0
+            self._limiter_not_before[server] = self.clock.now() + datetime.timedelta(seconds=wait_for)
+
+    def _next_ready(self, scheduled_fetchers: List[_ScheduledFetcher]) -> Optional[_ScheduledFetcher]:
+        """
+        Picks the next fetcher (of one server) to make a request, waiting (on the clock) if none is ready yet.
+        Waits in slices of at most a second, and returns None if the crawl is stopped meanwhile.
+        """
+        while not self._stop.is_set():
+            now = self.clock.now()
+            earliest = None
+            for scheduled in scheduled_fetchers:
+                ready_at = self._ready_at(scheduled)
+                if ready_at <= now and self.breakers[scheduled.fetcher.server].allow_request():
+                    return scheduled
+                earliest = ready_at if earliest is None else min(earliest, ready_at)
+            with profiler.stage("limiter_wait"):
+                self.clock.sleep(min(max((earliest - now).total_seconds(), 0.0), 1.0))
+        return None
+
+    def _put(self, results: queue.Queue, item: Any) -> bool:
+        """
+        Hands an item to the consumer, unless the crawl is stopped meanwhile.
+
+        Returns:
+            bool: whether the item was handed over.
+        """
+        while not self._stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _crawl_server(self, server: Server, results: queue.Queue) -> None:
+        """
+        Worker: crawls all fetchers of one server.
+        """
+        scheduled_fetchers = self._scheduled[server]
+        breaker = self.breakers[server]
+        try:
+            while scheduled_fetchers and not self._stop.is_set():
+                scheduled = self._next_ready(scheduled_fetchers)
+                if scheduled is None:
+                    return
+                # round-robin: move to the back of the queue
+                scheduled_fetchers.remove(scheduled)
+                scheduled_fetchers.append(scheduled)
+                if server in self.rate_limiters:
+                    self.rate_limiters[server].last_invoked = self.clock.now()
+
+                try:
+                    # the fetcher only moves to the next page on success > failed pages are re-queued
+                    data = next(scheduled.fetcher)
+                except StopIteration:
+                    breaker.record_success()
+                    scheduled_fetchers.remove(scheduled)
+                    continue
+                except Exception as e:
+                    if not is_retriable(e):
+                        raise
+                    self._schedule_limiters(server)
+                    breaker.record_failure()
+                    if scheduled.attempts >= self.max_retries_per_page:
+                        scheduled_fetchers.remove(scheduled)
+                        with self._lock:
+                            self.failed.append((scheduled.fetcher, e))
+                        continue
+                    delay = max(self.backoff.delay(scheduled.attempts), _retry_after(e))
+                    scheduled.not_before = self.clock.now() + datetime.timedelta(seconds=delay)
+                    scheduled.attempts += 1
+                    with self._lock:
+                        self.n_retries += 1
+                    continue
+
+                self._schedule_limiters(server)
+                breaker.record_success()
+                scheduled.attempts = 0
+                if not data or scheduled.fetcher.exhausted:
+                    # no entries left for those params > don't wait on the limiters just to stop
+                    scheduled_fetchers.remove(scheduled)
+                if not data:
+                    continue
+                if not self._put(results, (scheduled.fetcher, data)):
+                    return
+        except Exception as e:
+            self._put(results, _WorkerError(e))
+        finally:
+            self._put(results, _WORKER_DONE)
+
+    def __iter__(self) -> Generator[Tuple[EntryFetcher, List[Dict[str, Any]]], None, None]:
+        """
+        Yields:
+            Generator[Tuple[EntryFetcher, List[Dict[str, Any]]], None, None]: (fetcher, fetched entries) per page.
+        """
+        if not self._scheduled:
+            return
+        self._stop.clear()
+        results = queue.Queue(maxsize=self.max_pending_pages)
+        workers = [
+            threading.Thread(
+                target=self._crawl_server, args=(server, results), name=f"crawl-{server.name}", daemon=True
+            )
+            for server in self._scheduled
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            n_running = len(workers)
+            while n_running:
+                result = results.get()
+                if result is _WORKER_DONE:
+                    n_running -= 1
+                elif isinstance(result, _WorkerError):
+                    raise result.error
+                else:
+                    yield result
+        finally:
+            # also stops the workers when the consumer stops iterating early
+            self._stop.set()
+            for worker in workers:
+                worker.join()
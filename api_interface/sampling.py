@@ -0,0 +1,203 @@
+from typing import Dict, List, Any, Optional, Union, Mapping
+from concurrent.futures import ThreadPoolExecutor
+import math
+import random
+import threading
+from .league_entries import EntryFetcher
+from .division_probe import DivisionSize, DivisionProbe, estimate_division_size
+from .crawl_plan import _largest_remainder
+from .rate_limiters import RateLimiterCollection
+
+
+def plan_sample(
+    division_size: DivisionSize,
+    n_entries: Optional[int] = None,
+    fraction_per_page: Optional[float] = None,
+    n_pages: Optional[int] = None,
+    seed: Optional[Union[int, str]] = 0,
+) -> Dict[int, int]:
+    """
+    Picks random pages of a division and how many entries to sample from each of them.
+    Exactly one of [n_entries] / [fraction_per_page] has to be provided:
+        > n_entries: the quota is spread over [n_pages] random pages proportionally to their size.
+          [n_pages] defaults to the minimum needed, i.e. as many requests as reading the first pages.
+        > fraction_per_page: that fraction of every one of [n_pages] random pages (defaults to all pages).
+
+    Args:
+        division_size (DivisionSize): size of the division (see `division_probe`).
+        n_entries (Optional[int], optional): total amount of entries to sample. Defaults to None.
+        fraction_per_page (Optional[float], optional): fraction of each sampled page to keep. Defaults to None.
+        n_pages (Optional[int], optional): amount of pages to sample from. Defaults to None.
+        seed (Optional[Union[int, str]], optional): seed of the page selection. Defaults to 0.
+
+    Returns:
+        Dict[int, int]: {page: amount of entries to sample from it}, sorted by page.
+    """
+    assert (n_entries is None) != (
+        fraction_per_page is None
+    ), "Provide exactly one of `n_entries` / `fraction_per_page`!"
+    last_page, page_size = division_size.last_page, division_size.page_size
+    if not last_page:
+        return {}
+    sizes = {page: page_size for page in range(1, last_page)}
+    sizes[last_page] = division_size.n_entries - (last_page - 1) * page_size
+
+    rng = random.Random(seed)
+    order = list(sizes)
+    rng.shuffle(order)
+    if fraction_per_page is not None:
+        pages = order[: n_pages or last_page]
+        quotas = {page: round(fraction_per_page * sizes[page]) for page in pages}
+    else:
+        n_entries = min(n_entries, division_size.n_entries)
+        pages = order[: max(n_pages or 0, math.ceil(n_entries / page_size))]
+        # a partially filled last page may leave us short > take more pages
+        while sum(sizes[page] for page in pages) < n_entries:
+            pages = order[: len(pages) + 1]
+        quotas = _largest_remainder(n_entries, {page: sizes[page] for page in pages})
+    return {page: quotas[page] for page in sorted(quotas) if quotas[page]}
+
+
+def _subsample(
+    entry_fetcher: EntryFetcher,
+    data: List[Dict[str, Any]],
+    quota: int,
+    seed: Union[int, str],
+    page: int,
+) -> List[Dict[str, Any]]:
+    """
+    Reproducibly picks [quota] random entries of a page (keeping their order), independent of fetch order.
+    Logs the page (and which entries were kept) to the fetcher's page log.
+    """
+    if quota >= len(data):
+        entry_fetcher.log_page(page, data)
+        return data
+    rng = random.Random(f"{seed}:{page}")
+    kept = sorted(rng.sample(range(len(data)), quota))
+    entry_fetcher.log_page(page, data, kept=kept)
+    return [data[i] for i in kept]
+
+
+class SampledEntryFetcher(EntryFetcher):
+    """
+    `EntryFetcher` that iterates over a random sample of pages (see `plan_sample`), in random order,
+    and yields a random subset of [quota] entries of each page.
+    Like `EntryFetcher`, it only moves on after a page was fetched successfully, so it can be used by a `ResilientCrawler`.
+
+    The sampled pages are either given ([page_quotas]), or planned on the first `next()` call from a probe of the
+    division's size (see `division_probe`). Probed pages are cached, so a failed probe request raises like any
+    other request and the retried `next()` call resumes the probe where it failed.
+
+    Args:
+        *args, **kwargs: arguments of `EntryFetcher`.
+        page_quotas (Optional[Mapping[int, int]], optional): {page: amount of entries to sample from it}.
+            Defaults to None (planned from [n_entries] / [fraction_per_page] / [n_pages], see `plan_sample`).
+        seed (Optional[Union[int, str]], optional): seed of the page selection, order and entry selection. Defaults to 0.
+        rate_limiters (Optional[RateLimiterCollection], optional): waited on before every request of a `next()` call
+            that probes (which makes several requests). Defaults to None.
+    """
+
+    def __init__(
+        self,
+        *args,
+        page_quotas: Optional[Mapping[int, int]] = None,
+        n_entries: Optional[int] = None,
+        fraction_per_page: Optional[float] = None,
+        n_pages: Optional[int] = None,
+        seed: Optional[Union[int, str]] = 0,
+        rate_limiters: Optional[RateLimiterCollection] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        assert page_quotas is not None or (n_entries is None) != (
+            fraction_per_page is None
+        ), "Provide `page_quotas`, or exactly one of `n_entries` / `fraction_per_page`!"
+        self.seed = seed
+        self.rate_limiters = rate_limiters
+        self._sample_params = dict(n_entries=n_entries, fraction_per_page=fraction_per_page, n_pages=n_pages)
+        self._probe = DivisionProbe(self, rate_limiters=rate_limiters)
+        self.page_quotas = None
+        self.pages = []
+        self._page_idx = 0
+        if page_quotas is not None:
+            self._set_page_quotas(page_quotas)
+
+    def _set_page_quotas(self, page_quotas: Mapping[int, int]) -> None:
+        self.page_quotas = dict(page_quotas)
+        self.pages = list(self.page_quotas)
+        random.Random(f"{self.seed}:order").shuffle(self.pages)
+        self.current_page = self.pages[0] if self.pages else 1
+
+    @property
+    def exhausted(self) -> bool:
+        return self.page_quotas is not None and self._page_idx >= len(self.pages)
+
+    def __next__(self) -> List[Dict[str, Any]]:
+        """
+        Raises:
+            StopIteration: when all sampled pages have been fetched.
+
+        Returns:
+            List[Dict[str, Any]]: the sampled league entries of the next page.
+        """
+        if self.page_quotas is None:
+            self._set_page_quotas(plan_sample(self._probe.probe(), seed=self.seed, **self._sample_params))
+            if self.pages and self.rate_limiters is not None:
+                self.rate_limiters.wait()
+        if self._page_idx >= len(self.pages):
+            raise StopIteration
+        page = self.pages[self._page_idx]
+        data = _subsample(
+            self, self.fetch_next_page(page=page), self.page_quotas[page], self.seed, page
+        )
+
+        self.entries_fetched += len(data)
+        self._page_idx += 1
+        if self._page_idx < len(self.pages):
+            self.current_page = self.pages[self._page_idx]
+        return data
+
+
+def sample_division(
+    entry_fetcher: EntryFetcher,
+    n_entries: Optional[int] = None,
+    fraction_per_page: Optional[float] = None,
+    n_pages: Optional[int] = None,
+    seed: Optional[Union[int, str]] = 0,
+    max_workers: Optional[int] = 4,
+    rate_limiters: Optional[RateLimiterCollection] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Draws a seeded, reproducible random sample of a division:
+    probes its size, picks pages (see `plan_sample`) and fetches them concurrently and out of order.
+
+    Args:
+        entry_fetcher (EntryFetcher): Fetcher describing the (server, queue, tier, division) to sample.
+        n_entries, fraction_per_page, n_pages, seed: see `plan_sample`.
+        max_workers (Optional[int], optional): pages fetched concurrently. Defaults to 4.
+        rate_limiters (Optional[RateLimiterCollection], optional): Rate limiters to respect. Defaults to None.
+
+    Returns:
+        List[Dict[str, Any]]: the sampled league entries, ordered by page (independent of fetch order).
+    """
+    division_size = estimate_division_size(entry_fetcher, rate_limiters=rate_limiters)
+    page_quotas = plan_sample(
+        division_size,
+        n_entries=n_entries,
+        fraction_per_page=fraction_per_page,
+        n_pages=n_pages,
+        seed=seed,
+    )
+    lock = threading.Lock()
+
+    def _fetch(page: int) -> List[Dict[str, Any]]:
+        if rate_limiters is not None:
+            with lock:
+                rate_limiters.wait()
+        return _subsample(
+            entry_fetcher, entry_fetcher.fetch_next_page(page=page), page_quotas[page], seed, page
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {page: executor.submit(_fetch, page) for page in page_quotas}
+        return [entry for page in sorted(futures) for entry in futures[page].result()]
@@ -0,0 +1,52 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for a regional Riot API host, speaking HTTP/1.1 (keep-alive).
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps([{"token": self.headers.get("X-Riot-Token"), "path": self.path}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connections_are_reused_per_host():
+    """
+    Tests that consecutive requests to a host share one persistent connection, and stats are reported.
+    """
+    from .connection_pools import pooled_lolwatcher
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        lolwatcher = pooled_lolwatcher(api_key="dummy", timeout=5)
+        pools = lolwatcher.connection_pools
+        assert pools in lolwatcher._base_api._request_handlers
+
+        url = f"http://127.0.0.1:{server.server_port}/lol/league/v4/entries"
+        for page in range(1, 6):
+            response = pools.preview_request("euw1", "LeagueApiV4", "entries", url, {"page": page})
+            assert response.json()[0] == {"token": "dummy", "path": f"/lol/league/v4/entries?page={page}"}
+
+        stats = pools.stats()[f"127.0.0.1:{server.server_port}"]
+        assert stats.n_requests == 5
+        assert stats.n_connections == 1
+        assert stats.connection_reuse == 0.8
+        assert stats.bytes_received > 0
+        pools.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,18 @@
+def test_plan_adds_up_to_target():
+    """
+    Test that cells add up to exactly the target, and pages cover every cell.
+    """
+    from .crawl_plan import plan_crawl
+    from utils.enums import Server, Tier, Division
+
+    for n_total in (1, 999, 123_456):
+        cells = plan_crawl(n_total=n_total)
+        assert sum(c.n_entries for c in cells) == n_total
+        for cell in cells:
+            assert (cell.n_pages - 1) * 205 < cell.n_entries <= cell.n_pages * 205
+
+    cells = {(c.server, c.tier, c.division): c for c in plan_crawl(n_total=100_000, servers=[Server.EUW])}
+    assert {server for server, _, _ in cells} == {Server.EUW}
+    # gold IV is the biggest cell of the static distribution
+    assert max(cells.values(), key=lambda c: c.n_entries).tier == Tier.GOLD
+    assert cells[(Server.EUW, Tier.GOLD, Division.FOUR)].n_entries > cells[(Server.EUW, Tier.DIAMOND, Division.ONE)].n_entries
@@ -0,0 +1,43 @@
+def test_simulated_crawl_of_single_server():
+    """
+    Tests the predicted runtime and bottleneck of a crawl on a single server.
+    """
+    from .crawl_simulator import simulate_crawl
+    from .rate_limiters import DevelopmentKeyRateLimiters
+    from utils.enums import Server
+
+    report = simulate_crawl(
+        plan=[(Server.EUW, 6), (Server.EUW, 4)], rate_limiters=DevelopmentKeyRateLimiters, latency=0.0
+    )
+    assert report.n_requests == 10
+    # every request after the first waits (2 minutes / 100) = 1.2 seconds
+    assert abs(report.runtime_seconds - 9 * 1.2) < 1e-6
+    assert abs(report.idle_seconds[Server.EUW] - 9 * 1.2) < 1e-6
+    assert report.bottleneck[Server.EUW] == "100 requests per 2minutes"
+    # the shared (module-level) limiters are never touched by a simulation
+    assert DevelopmentKeyRateLimiters.get_wait_time() is None
+
+
+def test_simulated_servers_run_concurrently():
+    """
+    Tests that servers are limited independently and crawled concurrently.
+    """
+    from .crawl_simulator import simulate_crawl
+    from .rate_limiters import ProductionKeyRateLimiters
+    from utils.enums import Server
+
+    latencies = {Server.EUW: 0.1, Server.KR: 0.3}
+    report = simulate_crawl(
+        plan=[(Server.EUW, 100), (Server.KR, 100)],
+        rate_limiters=ProductionKeyRateLimiters,
+        latency=latencies.get,
+    )
+    assert report.runtime_seconds == max(report.runtime_per_server.values())
+    assert report.runtime_per_server[Server.KR] > report.runtime_per_server[Server.EUW]
+    for server, latency in latencies.items():
+        assert abs(report.busy_seconds[server] - 100 * latency) < 1e-6
+        assert abs(
+            report.runtime_per_server[server]
+            - report.busy_seconds[server]
+            - report.idle_seconds.get(server, 0.0)
+        ) < 1e-3
@@ -0,0 +1,44 @@
+from utils.testing import fake_lolwatcher
+
+
+def _get_fetcher(lolwatcher):
+    from .league_entries import EntryFetcher
+    from utils.enums import Tier, Division, RankedQueue, Server
+
+    return EntryFetcher(
+        lolwatcher=lolwatcher,
+        tier=Tier.GOLD,
+        division=Division.FOUR,
+        ranked_queue=RankedQueue.SOLO_DUO,
+        server=Server.EUW,
+    )
+
+
+def test_probe_finds_exact_division_size():
+    """
+    Test that the probe finds the exact amount of entries for a range of division sizes.
+    """
+    from .division_probe import estimate_division_size
+
+    for n_entries in (0, 1, 204, 205, 206, 410, 411, 1_000, 50_000, 123_456):
+        lolwatcher, _ = fake_lolwatcher(n_entries=n_entries)
+        size = estimate_division_size(_get_fetcher(lolwatcher))
+        assert size.n_entries == n_entries
+        assert size.last_page == -(-n_entries // 205)
+
+
+def test_probe_uses_logarithmic_amount_of_requests():
+    """
+    Test that the probe does not walk all pages, and leaves the fetcher's iteration state untouched.
+    """
+    from .division_probe import estimate_division_size
+    from .crawl_plan import max_probe_requests
+    import math
+
+    lolwatcher, requested_pages = fake_lolwatcher(n_entries=205 * 1_000)
+    ef = _get_fetcher(lolwatcher)
+    size = estimate_division_size(ef)
+    assert size.last_page == 1_000
+    assert size.n_requests == len(set(requested_pages))
+    assert size.n_requests <= max_probe_requests(1_000) == 2 * math.ceil(math.log2(1_000)) + 2
+    assert ef.current_page == 1
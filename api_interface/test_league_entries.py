@@ -3,12 +3,12 @@ def test_correct_fetching():
     Test EntryFetcher class fetching.
     """
     import os
-    from .league_entries import EntryFetcher, _TESTING_PURPOSES_EF_PARAMS
+    from .league_entries import EntryFetcher, _testing_purposes_ef_params
 
     api_key = os.environ.get("X_RIOT_TOKEN")
     assert api_key is not None
 
-    ef = EntryFetcher(**_TESTING_PURPOSES_EF_PARAMS)
+    ef = EntryFetcher(**_testing_purposes_ef_params())
     for idx, data in enumerate(ef):
         assert data is not None
 
@@ -35,4 +35,22 @@ def test_rate_limiter_collection_after_set_wants_to_wait():
         to_wait = rate_limiters.get_wait_time()
         rate_limiters.last_invoked = datetime.datetime.now()
         if idx != 0:
-            assert to_wait is not None
\ No newline at end of file
+            assert to_wait is not None
+
+
+def test_rate_limiter_collection_waits_on_virtual_clock():
+    """
+    Tests that limiters use their injected clock, so waiting does not take real time.
+    """
+    from .clock import VirtualClock
+
+    clock = VirtualClock()
+    rate_limiters = RateLimiterCollection(rate_limiters=_get_fresh_limiters(), clock=clock)
+    assert rate_limiters.wait() is None
+    assert clock.elapsed == 0.0
+    # 5 requests per minute is the tightest limit: (60s / 5)
+    assert str(rate_limiters.get_bottleneck()) == "5 requests per 1minutes"
+    waited = rate_limiters.wait()
+    assert waited == 12.0
+    assert clock.elapsed == 12.0
+    assert rate_limiters.copy().get_wait_time() is None
@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+from utils.testing import fake_lolwatcher, http_error
+
+
+def _get_fetchers(lolwatcher, servers):
+    from .league_entries import EntryFetcher
+    from utils.enums import Tier, Division, RankedQueue
+
+    return [
+        EntryFetcher(
+            lolwatcher=lolwatcher,
+            tier=Tier.GOLD,
+            division=Division.FOUR,
+            ranked_queue=RankedQueue.SOLO_DUO,
+            server=server,
+        )
+        for server in servers
+    ]
+
+
+def test_degraded_region_does_not_abort_healthy_regions():
+    """
+    Tests that a permanently failing region is given up on, while other regions are fully crawled.
+    """
+    from .resilience import ResilientCrawler, Backoff
+    from .clock import VirtualClock
+    from utils.enums import Server
+
+    clock = VirtualClock()
+    lolwatcher = fake_lolwatcher(n_entries=45, page_size=10, failures={Server.EUW.value: 10_000})[0]
+    crawler = ResilientCrawler(
+        fetchers=_get_fetchers(lolwatcher, (Server.EUW, Server.NA)),
+        clock=clock,
+        backoff=Backoff(seed=0),
+        max_retries_per_page=3,
+        failure_threshold=2,
+        cooldown_seconds=60.0,
+    )
+    fetched = {}
+    for fetcher, data in crawler:
+        fetched.setdefault(fetcher.server, []).extend(data)
+
+    assert len(fetched[Server.NA]) == 45
+    assert Server.EUW not in fetched
+    assert [f.server for f, _ in crawler.failed] == [Server.EUW]
+    assert crawler.breakers[Server.EUW].times_opened >= 1
+    assert crawler.breakers[Server.NA].times_opened == 0
+    # only virtual time was spent waiting for the cooldowns
+    assert clock.elapsed >= 60.0
+
+
+def test_transient_failures_are_retried():
+    """
+    Tests that failed pages are re-queued, so no entries are lost after a region recovers.
+    """
+    from .resilience import ResilientCrawler, Backoff
+    from .clock import VirtualClock
+    from utils.enums import Server
+
+    lolwatcher = fake_lolwatcher(n_entries=25, page_size=10, failures={Server.KR.value: 2})[0]
+    crawler = ResilientCrawler(
+        fetchers=_get_fetchers(lolwatcher, (Server.KR,)),
+        clock=VirtualClock(),
+        backoff=Backoff(seed=0),
+    )
+    entries = [e["summonerId"] for _, data in crawler for e in data]
+    assert entries == [f"KR_{i}" for i in range(25)]
+    assert crawler.n_retries == 2
+    assert not crawler.failed
+
+
+def test_non_retriable_errors_are_raised():
+    """
+    Tests that e.g. an invalid API key is not retried.
+    """
+    from .resilience import is_retriable
+    import requests
+
+    assert is_retriable(http_error(429))
+    assert is_retriable(http_error(504))
+    assert is_retriable(requests.Timeout())
+    assert not is_retriable(http_error(403))
+    assert not is_retriable(ValueError())
+
+
+def test_slow_region_does_not_block_other_regions():
+    """
+    Tests that every server is crawled by its own worker: a hanging request of one region
+    does not hold up the requests of another one.
+    """
+    from .resilience import ResilientCrawler
+    from utils.enums import Server
+    import threading
+
+    na_done = threading.Event()
+    euw_unblocked = []
+
+    def entries(region, queue, tier, division, page):
+        if region == Server.EUW.value and page == 1:
+            # hangs until NA is done (or times out, if regions were crawled one after another)
+            euw_unblocked.append(na_done.wait(timeout=5.0))
+        if page > 3:
+            if region == Server.NA.value:
+                na_done.set()
+            return []
+        return [{"summonerId": f"{region}_{page}"}]
+
+    lolwatcher = SimpleNamespace(league=SimpleNamespace(entries=entries))
+    crawler = ResilientCrawler(fetchers=_get_fetchers(lolwatcher, (Server.EUW, Server.NA)))
+    fetched = [e["summonerId"] for _, data in crawler for e in data]
+    assert euw_unblocked == [True]
+    assert sorted(fetched) == sorted(f"{r}_{p}" for r in ("EUW1", "NA1") for p in (1, 2, 3))
+
+
+def test_stopping_early_stops_workers():
+    """
+    Tests that the workers stop when the consumer stops iterating.
+    """
+    from .resilience import ResilientCrawler
+    from utils.enums import Server
+    import threading
+
+    lolwatcher = fake_lolwatcher(n_entries=10_000, page_size=10)[0]
+    crawler = ResilientCrawler(
+        fetchers=_get_fetchers(lolwatcher, (Server.EUW, Server.NA)), max_pending_pages=2
+    )
+    iterator = iter(crawler)
+    next(iterator)
+    iterator.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith("crawl-")]
+
+
+def test_non_retriable_errors_of_a_worker_are_raised():
+    """
+    Tests that e.g. an invalid API key in one region's worker stops the crawl.
+    """
+    from .resilience import ResilientCrawler
+    from utils.enums import Server
+
+    def entries(region, queue, tier, division, page):
+        raise http_error(403)
+
+    crawler = ResilientCrawler(
+        fetchers=_get_fetchers(SimpleNamespace(league=SimpleNamespace(entries=entries)), (Server.KR,))
+    )
+    try:
+        list(crawler)
+        assert False, "403 must be raised"
+    except Exception as e:
+        assert e.response.status_code == 403
+
+
+def test_rate_limited_crawl_matches_simulation():
+    """
+    Tests that a rate-limited crawl takes as long as `simulate_crawl` predicts for the same plan,
+    i.e. the limiters' wait is kept after each request, not re-polled until the whole interval passed.
+    """
+    from .resilience import ResilientCrawler
+    from .clock import VirtualClock
+    from .crawl_simulator import simulate_crawl
+    from .rate_limiters import DevelopmentKeyRateLimiters, ProductionKeyRateLimiters
+    from utils.enums import Server
+
+    for rate_limiters in (DevelopmentKeyRateLimiters, ProductionKeyRateLimiters):
+        clock = VirtualClock()
+        lolwatcher, requested_pages = fake_lolwatcher(n_entries=45, page_size=10)
+        crawler = ResilientCrawler(
+            fetchers=_get_fetchers(lolwatcher, (Server.EUW,)),
+            rate_limiters={Server.EUW: rate_limiters.copy(clock=clock)},
+            clock=clock,
+        )
+        assert sum(len(data) for _, data in crawler) == 45
+        # 5 pages + the empty page ending the division
+        assert len(requested_pages) == 6
+        report = simulate_crawl(plan=[(Server.EUW, 6)], rate_limiters=rate_limiters, latency=0.0)
+        assert abs(clock.elapsed - report.runtime_seconds) < 1e-3
@@ -0,0 +1,126 @@
+from utils.testing import fake_lolwatcher, http_error
+
+
+def _fetcher_params(lolwatcher):
+    from utils.enums import Tier, Division, RankedQueue, Server
+
+    return dict(
+        lolwatcher=lolwatcher,
+        tier=Tier.GOLD,
+        division=Division.FOUR,
+        ranked_queue=RankedQueue.SOLO_DUO,
+        server=Server.EUW,
+    )
+
+
+def test_plan_sample_quota():
+    """
+    Test that a quota is spread over as many random pages as reading the first pages would take.
+    """
+    from .division_probe import DivisionSize
+    from .sampling import plan_sample
+
+    size = DivisionSize(last_page=100, page_size=205, n_entries=99 * 205 + 10, n_requests=0)
+    quotas = plan_sample(size, n_entries=500, seed=1)
+    assert sum(quotas.values()) == 500
+    assert len(quotas) >= 3
+    assert all(0 < quotas[page] <= 205 for page in quotas)
+    assert quotas != {1: 205, 2: 205, 3: 90}
+    assert quotas == plan_sample(size, n_entries=500, seed=1)
+    assert quotas != plan_sample(size, n_entries=500, seed=2)
+
+    # spread the quota over more (smaller) page samples
+    quotas = plan_sample(size, n_entries=500, n_pages=20, seed=1)
+    assert len(quotas) == 20 and sum(quotas.values()) == 500
+    # asking for more than the division holds returns all of it
+    assert sum(plan_sample(size, n_entries=10 ** 6).values()) == size.n_entries
+
+
+def test_plan_sample_fraction():
+    """
+    Test that a fixed fraction is taken from every (sampled) page.
+    """
+    from .division_probe import DivisionSize
+    from .sampling import plan_sample
+
+    size = DivisionSize(last_page=10, page_size=200, n_entries=9 * 200 + 50, n_requests=0)
+    quotas = plan_sample(size, fraction_per_page=0.1)
+    assert sorted(quotas) == list(range(1, 11))
+    assert quotas[10] == 5 and all(quotas[page] == 20 for page in range(1, 10))
+    assert len(plan_sample(size, fraction_per_page=0.1, n_pages=3)) == 3
+
+
+def test_sampled_entry_fetcher_is_reproducible():
+    """
+    Test that the sampled fetcher visits the sampled pages out of order and yields the same entries per seed.
+    """
+    from .sampling import SampledEntryFetcher
+
+    def _sample(seed):
+        lolwatcher, requested_pages = fake_lolwatcher(n_entries=205 * 50)
+        fetcher = SampledEntryFetcher(
+            **_fetcher_params(lolwatcher), page_quotas={3: 10, 17: 205, 40: 1}, seed=seed
+        )
+        return [e["summonerId"] for page in fetcher for e in page], requested_pages
+
+    entries, requested_pages = _sample(seed=0)
+    assert sorted(requested_pages) == [3, 17, 40]
+    assert len(entries) == 216
+    assert len({int(e.split("_")[1]) // 205 for e in entries}) == 3
+    assert _sample(seed=0) == (entries, requested_pages)
+    assert _sample(seed=1)[0] != entries
+
+
+def test_sample_division():
+    """
+    Test that the concurrent sampling of a division is reproducible, regardless of the order pages are fetched in.
+    """
+    from .league_entries import EntryFetcher
+    from .sampling import sample_division
+
+    def _sample(max_workers):
+        lolwatcher, requested_pages = fake_lolwatcher(n_entries=205 * 200 + 17)
+        entries = sample_division(
+            EntryFetcher(**_fetcher_params(lolwatcher)), n_entries=1_000, seed=7, max_workers=max_workers
+        )
+        return [e["summonerId"] for e in entries], requested_pages
+
+    entries, requested_pages = _sample(max_workers=8)
+    assert len(entries) == len(set(entries)) == 1_000
+    # far from the top LP band only
+    assert max(int(e.split("_")[1]) for e in entries) > 205 * 10
+    assert _sample(max_workers=1)[0] == entries
+
+
+def test_failed_probe_is_retried_by_the_crawler():
+    """
+    Test that the size probe runs inside the crawl: a 503 while probing is retried (resuming the probe),
+    and the crawl draws the same sample as without failures.
+    """
+    from .sampling import SampledEntryFetcher
+    from .resilience import ResilientCrawler, Backoff
+    from .clock import VirtualClock
+
+    def _crawl(failing_requests):
+        lolwatcher, requested_pages = fake_lolwatcher(n_entries=205 * 300 + 5)
+        fetch = lolwatcher.league.entries
+        n_requests = [0]
+
+        def entries(*args, **kwargs):
+            n_requests[0] += 1
+            if n_requests[0] in failing_requests:
+                raise http_error(503)
+            return fetch(*args, **kwargs)
+
+        lolwatcher.league.entries = entries
+        fetcher = SampledEntryFetcher(**_fetcher_params(lolwatcher), n_entries=500, seed=3)
+        crawler = ResilientCrawler(fetchers=[fetcher], clock=VirtualClock(), backoff=Backoff(seed=0))
+        return [e["summonerId"] for _, data in crawler for e in data], crawler, requested_pages
+
+    entries, _, requested_pages = _crawl(failing_requests=())
+    assert len(entries) == 500
+    flaky_entries, crawler, flaky_requested_pages = _crawl(failing_requests=(2, 5))
+    assert flaky_entries == entries
+    assert crawler.n_retries == 2 and not crawler.failed
+    # the probe resumed instead of starting over
+    assert len(flaky_requested_pages) == len(requested_pages)
@@ -0,0 +1,364 @@
+"""
+Command line entry point: `python -m cli {crawl,plan,export,stats,migrate} ...`
+
+Heavy dependencies (riotwatcher, SQLAlchemy, NumPy) are only imported by the commands that need them,
+so e.g. `plan` / `crawl --dry-run` start fast and never touch the network or a database.
+"""
+from typing import List, Optional
+import argparse
+import datetime
+import os
+import sys
+
+_KEY_RATE_LIMITERS = {
+    "development": "DevelopmentKeyRateLimiters",
+    "personal": "PersonalKeyRateLimiters",
+    "production": "ProductionKeyRateLimiters",
+}
+
+
+def _rate_limiters(key: str):
+    from api_interface import rate_limiters
+
+    return getattr(rate_limiters, _KEY_RATE_LIMITERS[key])
+
+
+def _plan_cells(args: argparse.Namespace):
+    from api_interface.crawl_plan import plan_crawl
+    from utils.enums import RankedQueue, Server
+
+    return plan_crawl(
+        n_total=args.n_total,
+        ranked_queue=RankedQueue[args.queue],
+        servers=[Server[s] for s in args.servers] if args.servers else None,
+    )
+
+
+def _table(args: argparse.Namespace):
+    if args.compact:
+        from data.database_orm.tables.compact_player import CompactPlayer
+
+        return CompactPlayer
+    from data.database_orm.tables.player import Player
+
+    return Player
+
+
+def plan(args: argparse.Namespace) -> int:
+    """
+    Prints the per-cell request count and the estimated duration of a crawl (no network, no DB).
+    Servers are crawled concurrently, the requests of a server one after another (see `ResilientCrawler`).
+    """
+    from api_interface.crawl_plan import estimate_probe_requests
+    from api_interface.crawl_simulator import simulate_crawl
+
+    cells = _plan_cells(args)
+    # sampling probes the size of every division first
+    n_probes = [estimate_probe_requests(cell) if args.sample else 0 for cell in cells]
+    report = simulate_crawl(
+        plan=[(cell.server, cell.n_pages + probes) for cell, probes in zip(cells, n_probes)],
+        rate_limiters=_rate_limiters(args.key),
+        latency=args.latency,
+    )
+    print(f"{'server':<8}{'tier':<10}{'division':<10}{'entries':>10}{'requests':>10}{'probes':>8}")
+    for cell, probes in zip(cells, n_probes):
+        print(
+            f"{cell.server.name:<8}{cell.tier.value:<10}{cell.division.value:<10}"
+            f"{cell.n_entries:>10,}{cell.n_pages:>10,}{probes:>8,}"
+        )
+    print(
+        f"\n{len(cells)} cells, {sum(c.n_entries for c in cells):,} entries, "
+        f"{report.n_requests:,} requests{f' (incl. {sum(n_probes):,} probes)' if args.sample else ''} "
+        f"with a {args.key} key"
+    )
+    print(f"estimated duration: {datetime.timedelta(seconds=round(report.runtime_seconds))}")
+    for server, runtime in sorted(report.runtime_per_server.items(), key=lambda i: -i[1]):
+        print(
+            f"  {server.name:<6} {datetime.timedelta(seconds=round(runtime))} "
+            f"(idle {report.idle_seconds.get(server, 0.0) / max(runtime, 1e-9):.0%}, "
+            f"bottleneck: {report.bottleneck[server]})"
+        )
+    return 0
+
+
+def _sampled_fetcher(lolwatcher, cell, seed: int, rate_limiters, page_log=None):
+    """
+    Fetcher that samples [cell.n_entries] entries from random pages of the division, instead of its first pages.
+    It probes the size of the division on its first request, so the probe is retried like any page.
+    """
+    from api_interface.sampling import SampledEntryFetcher
+
+    return SampledEntryFetcher(
+        lolwatcher=lolwatcher,
+        tier=cell.tier,
+        division=cell.division,
+        ranked_queue=cell.ranked_queue,
+        server=cell.server,
+        page_log=page_log,
+        n_entries=cell.n_entries,
+        # every cell gets its own (reproducible) seed
+        seed=f"{seed}:{cell.server.name}:{cell.ranked_queue.name}:{cell.tier.name}:{cell.division.name}",
+        rate_limiters=rate_limiters,
+    )
+
+
+def _fetchers(args: argparse.Namespace, cells, lolwatcher, server_rate_limiters, page_log=None):
+    """
+    One fetcher per planned cell: its first [cell.n_entries] entries, or a random sample of them with `--sample`.
+    """
+    if args.sample:
+        return [
+            _sampled_fetcher(lolwatcher, cell, args.seed, server_rate_limiters[cell.server], page_log=page_log)
+            for cell in cells
+        ]
+    from api_interface.league_entries import EntryFetcher
+
+    return [
+        EntryFetcher(
+            lolwatcher=lolwatcher,
+            tier=cell.tier,
+            division=cell.division,
+            ranked_queue=cell.ranked_queue,
+            server=cell.server,
+            max_entries=cell.n_entries,
+            page_log=page_log,
+        )
+        for cell in cells
+    ]
+
+
+def crawl(args: argparse.Namespace) -> int:
+    """
+    Crawls the planned cells into the database.
+    """
+    if args.dry_run:
+        return plan(args)
+
+    from contextlib import ExitStack
+    from api_interface.connection_pools import pooled_lolwatcher
+    from api_interface.resilience import ResilientCrawler
+    from data.data_buffers import DatabaseBuffer, ShardedDatabaseBuffer, DuplicateFilter
+    from data.raw_page_log import RawPageLog
+
+    cells = _plan_cells(args)
+    rate_limiters = _rate_limiters(args.key)
+    server_rate_limiters = {cell.server: rate_limiters.copy() for cell in cells}
+    lolwatcher = pooled_lolwatcher(os.environ.get("X_RIOT_TOKEN"), timeout=args.timeout)
+    TableInstance = _table(args)
+
+    with ExitStack() as stack:
+        page_log = stack.enter_context(RawPageLog(args.raw_log)) if args.raw_log else None
+        crawler = ResilientCrawler(
+            fetchers=_fetchers(args, cells, lolwatcher, server_rate_limiters, page_log=page_log),
+            rate_limiters=server_rate_limiters,
+        )
+        if args.sharded:
+            from data.database_orm.session.shard_router import ShardRouter
+
+            buffer = stack.enter_context(
+                ShardedDatabaseBuffer(
+                    TableInstance=TableInstance, router=ShardRouter(), batch_size=args.batch_size
+                )
+            )
+        else:
+            buffer = stack.enter_context(
+                DatabaseBuffer(TableInstance=TableInstance, batch_size=args.batch_size)
+            )
+
+        n_entries, unseen = 0, DuplicateFilter()
+        for fetcher, data in crawler:
+            data = unseen(data, server=fetcher.server)
+            for entry in data:
+                entry["server"] = fetcher.server
+            if args.sharded:
+                buffer.add(data, server=fetcher.server)
+            else:
+                buffer.add(data)
+            n_entries += len(data)
+
+    print(f"fetched {n_entries:,} entries with {crawler.n_retries:,} retries")
+    for fetcher, error in crawler.failed:
+        print(
+            f"  gave up on {fetcher.server.name} {fetcher.tier.value} {fetcher.division.value} "
+            f"(page {fetcher.current_page}): {error}",
+            file=sys.stderr,
+        )
+    for host, stats in lolwatcher.connection_pools.stats().items():
+        print(f"  {host}: {stats.n_requests:,} requests over {stats.n_connections} connection(s)")
+    return 1 if crawler.failed else 0
+
+
+def export(args: argparse.Namespace) -> int:
+    """
+    Exports the (merged) players table into a csv file.
+    """
+    TableInstance = _table(args)
+    if args.sharded:
+        from data.database_orm.session.shard_router import ShardRouter
+
+        n_rows = ShardRouter().export_csv(args.path, TableInstance)
+    else:
+        import csv
+        from sqlalchemy import inspect
+        from data.database_orm.session.session_handler import session_scope
+
+        columns = [
+            attr.key
+            for attr in inspect(TableInstance).column_attrs
+            if not any(c.primary_key or c.foreign_keys for c in attr.columns)
+        ]
+        n_rows = 0
+        with open(args.path, "w", newline="") as f, session_scope() as session:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in session.query(*[getattr(TableInstance, c) for c in columns]).yield_per(10_000):
+                # enums are exported by their API value
+                writer.writerow([getattr(v, "value", v) for v in row])
+                n_rows += 1
+    print(f"exported {n_rows:,} rows to {args.path}")
+    return 0
+
+
+def stats(args: argparse.Namespace) -> int:
+    """
+    Prints observed distributions (and their drift from the static ones) of the dumped data.
+    """
+    from data import analytics
+
+    if args.dump and os.path.exists(args.dump):
+        arrays = analytics.load_player_arrays_dump(args.dump)
+    else:
+        arrays = analytics.load_player_arrays(TableInstance=_table(args))
+        if args.dump:
+            analytics.dump_player_arrays(arrays, args.dump)
+    if not len(arrays.tier):
+        print("no players found")
+        return 1
+
+    print(f"{len(arrays.tier):,} players")
+    if (arrays.server != analytics.MISSING).any():
+        print(analytics.server_distribution(arrays))
+    else:
+        print("no server information (players were dumped by an older version)")
+    for distribution in analytics.ranked_distributions(arrays):
+        print(distribution)
+    print("drift from static distributions:")
+    for tier, divisions in analytics.ranked_drift(analytics.ranked_distributions(arrays)).items():
+        drifts = " | ".join(f"{division.value}: {drift:+.2%}" for division, drift in divisions.items())
+        print(f"  {tier.value}: {{{drifts}}}")
+    counts, edges = analytics.win_rate_histogram(arrays, bins=10)
+    print("win-rates: " + " | ".join(f"{lo:.0%}: {n:,}" for lo, n in zip(edges, counts)))
+    return 0
+
+
+def migrate(args: argparse.Namespace) -> int:
+    """
+    Creates the indexes missing from existing tables (e.g. of databases created before the indexes were declared).
+    """
+    from data.database_orm.session.session_handler import SessionCreator
+
+    # register all tables (indexes are only created for the tables that exist, no table is created)
+    import data.database_orm.tables.compact_player
+    import data.database_orm.tables.player
+    import data.database_orm.tables.summoner
+
+    if args.sharded:
+        from data.database_orm.session.shard_router import ShardRouter
+
+        router = ShardRouter()
+        creators = {
+            server.name: SessionCreator(db_string=router.connection_string(server), create_tables=False)
+            for server in router.existing_servers()
+        }
+    else:
+        creators = {"database": SessionCreator(create_tables=False)}
+    for name, creator in creators.items():
+        created = creator.create_missing_indexes()
+        print(f"{name}: created {len(created)} index(es) {', '.join(created)}".rstrip())
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    from utils.enums import RankedQueue, Server
+
+    parser = argparse.ArgumentParser(prog="python -m cli", description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--profile", action="store_true", help="report per-stage timings & allocations at the end of the run"
+    )
+    parser.add_argument("--profile-output", metavar="PATH", help="write the profile report here (default: stderr)")
+    parser.add_argument("--cprofile-output", metavar="PATH", help="also dump cProfile stats (.prof) here")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def _add_plan_args(command: argparse.ArgumentParser) -> None:
+        command.add_argument("n_total", type=int, help="total amount of players to fetch")
+        command.add_argument("--key", choices=sorted(_KEY_RATE_LIMITERS), default="development")
+        command.add_argument("--queue", choices=[q.name for q in RankedQueue], default="SOLO_DUO")
+        command.add_argument("--servers", nargs="+", choices=[s.name for s in Server])
+        command.add_argument(
+            "--latency", type=float, default=0.15, help="assumed seconds per request (estimates only)"
+        )
+        command.add_argument(
+            "--sample",
+            action="store_true",
+            help="sample random pages of each division instead of its first pages (probes division sizes first)",
+        )
+
+    def _add_table_args(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--compact", action="store_true", help="use the compact players table")
+
+    plan_command = commands.add_parser("plan", help="print the crawl plan and its estimated duration")
+    _add_plan_args(plan_command)
+    plan_command.set_defaults(func=plan)
+
+    crawl_command = commands.add_parser("crawl", help="crawl players into the database")
+    _add_plan_args(crawl_command)
+    _add_table_args(crawl_command)
+    crawl_command.add_argument("--dry-run", action="store_true", help="only print the plan (same as `plan`)")
+    crawl_command.add_argument("--batch-size", type=int, default=1_000)
+    crawl_command.add_argument(
+        "--timeout", type=float, default=10.0, help="seconds before a request is given up on (and retried)"
+    )
+    crawl_command.add_argument("--sharded", action="store_true", help="one database per server")
+    crawl_command.add_argument("--raw-log", metavar="DIR", help="also append raw pages to this directory")
+    crawl_command.add_argument("--seed", type=int, default=0, help="seed of `--sample`")
+    crawl_command.set_defaults(func=crawl)
+
+    export_command = commands.add_parser("export", help="export the players table into a csv file")
+    export_command.add_argument("path")
+    _add_table_args(export_command)
+    export_command.add_argument("--sharded", action="store_true", help="merge all per-server databases")
+    export_command.set_defaults(func=export)
+
+    stats_command = commands.add_parser("stats", help="print observed distributions of the players table")
+    _add_table_args(stats_command)
+    stats_command.add_argument(
+        "--dump", metavar="PATH", help="read this columnar (.npz) dump, or create it from the database"
+    )
+    stats_command.set_defaults(func=stats)
+
+    migrate_command = commands.add_parser(
+        "migrate", help="create the indexes missing from existing tables (may take a while on large tables)"
+    )
+    migrate_command.add_argument("--sharded", action="store_true", help="migrate all per-server databases")
+    migrate_command.set_defaults(func=migrate)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if not (args.profile or args.profile_output or args.cprofile_output):
+        return args.func(args)
+
+    from utils.profiling import profiler
+
+    profiler.enable(
+        report_path=args.profile_output, cprofile_path=args.cprofile_output, report_at_exit=False
+    )
+    try:
+        return args.func(args)
+    finally:
+        profiler.finish()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_python(code: str) -> str:
+    """
+    Runs [code] in a fresh interpreter (without an API key) and returns its stdout.
+    """
+    env = {k: v for k, v in os.environ.items() if k != "X_RIOT_TOKEN"}
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=_REPO_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def test_imports_have_no_side_effects():
+    """
+    Test that importing the fetching module does not require an API key (no `LolWatcher` at import time).
+    """
+    assert _run_python("import api_interface.league_entries; print('ok')").strip() == "ok"
+
+
+def test_dry_run_is_lightweight():
+    """
+    Test that a dry run neither imports the API client nor the DB layer.
+    """
+    output = _run_python(
+        "import sys\n"
+        "from cli.__main__ import main\n"
+        "main(['crawl', '2000', '--dry-run', '--key', 'production'])\n"
+        "print(sorted(m for m in ('riotwatcher', 'sqlalchemy', 'numpy') if m in sys.modules))\n"
+    )
+    assert "estimated duration" in output
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_plan_output():
+    """
+    Test the per-cell plan and totals printed by the `plan` command.
+    """
+    from .__main__ import main
+    from contextlib import redirect_stdout
+    import io
+
+    stdout = io.StringIO()
+    with redirect_stdout(stdout):
+        assert main(["plan", "500", "--servers", "EUW", "NA", "--latency", "0"]) == 0
+    output = stdout.getvalue()
+    assert "500 entries" in output
+    assert "EUW" in output and "NA" in output and "KR" not in output
+
+
+def test_plan_models_the_crawl():
+    """
+    Test that the estimate covers the requests of the busiest server one after another, and the probes of `--sample`.
+    """
+    from .__main__ import main
+    from api_interface.crawl_plan import plan_crawl
+    from contextlib import redirect_stdout
+    import collections
+    import datetime
+    import io
+
+    def _run(*argv):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            assert main(["plan", "100000", "--key", "production", "--latency", "0.15", *argv]) == 0
+        lines = stdout.getvalue().splitlines()
+        duration = next(line for line in lines if line.startswith("estimated duration"))
+        hours, minutes, seconds = map(int, duration.split(": ")[1].split(":"))
+        return lines, datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds).total_seconds()
+
+    pages_per_server = collections.Counter()
+    for cell in plan_crawl(n_total=100_000):
+        pages_per_server[cell.server] += cell.n_pages
+    _, duration = _run()
+    assert duration >= max(pages_per_server.values()) * 0.15 - 1
+
+    lines, sampled_duration = _run("--sample")
+    assert any("probes)" in line for line in lines)
+    assert sampled_duration > duration
+
+
+def test_plan_matches_the_crawl():
+    """
+    Test that the estimated duration is the (virtual) runtime of the crawl of the same plan,
+    and an upper bound of it with `--sample` (probes are estimated from the largest expected division).
+    """
+    from .__main__ import main, _build_parser, _plan_cells, _rate_limiters, _fetchers
+    from api_interface.clock import VirtualClock
+    from api_interface.resilience import ResilientCrawler
+    from contextlib import redirect_stdout
+    from utils.testing import fake_lolwatcher
+    import io
+
+    for key in ("development", "production"):
+        for sample in ((), ("--sample",)):
+            argv = ["3000", "--servers", "EUW", "--key", key, "--latency", "0", *sample]
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                assert main(["plan", *argv]) == 0
+            duration = next(line for line in stdout.getvalue().splitlines() if line.startswith("  EUW"))
+            hours, minutes, seconds = map(int, duration.split()[1].split(":"))
+            estimate = hours * 3600 + minutes * 60 + seconds
+
+            args = _build_parser().parse_args(["crawl", *argv])
+            cells = _plan_cells(args)
+            clock = VirtualClock()
+            server_rate_limiters = {cell.server: _rate_limiters(key).copy(clock=clock) for cell in cells}
+            lolwatcher, _ = fake_lolwatcher(n_entries=100_000)
+            crawler = ResilientCrawler(
+                fetchers=_fetchers(args, cells, lolwatcher, server_rate_limiters),
+                rate_limiters=server_rate_limiters,
+                clock=clock,
+            )
+            assert sum(len(data) for _, data in crawler) == sum(cell.n_entries for cell in cells)
+            if sample:
+                assert clock.elapsed <= estimate + 0.5
+            else:
+                assert abs(clock.elapsed - estimate) <= 0.5
+
+
+def test_migrate_only_adds_indexes():
+    """
+    Test that `migrate` creates the missing indexes of existing tables, without creating opt-in tables.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_string = f"sqlite:///{directory}/players.db"
+        output = _run_python(
+            "import os\n"
+            f"os.environ['RIOT_DATA_DUMP_DB_CONNECTION_STRING'] = {db_string!r}\n"
+            "from sqlalchemy import create_engine, inspect\n"
+            "from data.database_orm.tables.player import Player, MiniSeries\n"
+            "from cli.__main__ import main\n"
+            f"engine = create_engine({db_string!r})\n"
+            "Player.metadata.create_all(bind=engine, tables=[Player.__table__, MiniSeries.__table__])\n"
+            "engine.execute('DROP INDEX ix_players_summoner_name')\n"
+            "main(['migrate'])\n"
+            "print(sorted(inspect(engine).get_table_names()))\n"
+        )
+    lines = output.strip().splitlines()
+    assert lines[0] == "database: created 1 index(es) ix_players_summoner_name"
+    assert lines[-1] == "['miniseries', 'players']"
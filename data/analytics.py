@@ -0,0 +1,322 @@
+from typing import Mapping, Iterable, Any, Optional, Dict, Tuple, Type
+from collections import namedtuple
+import enum
+from itertools import islice
+import numpy as np
+from .database_orm import bot_declarative_base
+from .database_orm.session.session_handler import session_scope, SessionCreator
+from .database_orm.tables.player import Player
+from utils.enums import Server, RankedQueue, Tier, Division, enum_to_code
+from utils.distributions.rank_distributions import (
+    _RankedDistribution,
+    TotalDistribution as StaticRankedDistribution,
+)
+from utils.distributions.server_distributions import (
+    ServerDistribution,
+    TotalDistribution as StaticServerDistribution,
+)
+
+# columnar representation of the `players` table
+# > enum columns hold integer codes (see `utils.enums.enum_to_code`), all other columns hold plain numbers
+# > `MISSING` marks NULL values (tables written by older versions have no server, wins or losses)
+PlayerArrays = namedtuple(
+    "PlayerArrays",
+    ("server", "ranked_queue", "tier", "division", "league_points", "wins", "losses"),
+)
+
+MISSING = -1
+
+_ENUM_COLUMNS = {
+    "server": Server,
+    "ranked_queue": RankedQueue,
+    "tier": Tier,
+    "division": Division,
+}
+# rows without these are left out when loading (they cannot be placed in any cell)
+_REQUIRED_COLUMNS = ("ranked_queue", "tier", "division")
+
+
+def _encode(values: Iterable[Any], enum_cls: Type[enum.Enum]) -> np.ndarray:
+    """
+    Encodes a column of enum members (or their raw values, or integer codes) into an array of integer codes.
+    NULL values are encoded as `MISSING`.
+    """
+    values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=object)
+    present = values != None  # noqa: E711 (element-wise comparison)
+    codes = np.full(len(values), MISSING, dtype=np.int8)
+    if present.any() and isinstance(values[present][0], (int, np.integer)):
+        codes[present] = values[present].astype(np.int8)
+        return codes
+    # one vectorised comparison per enum member instead of a lookup per row
+    for member in enum_cls:
+        codes[(values == member) | (values == member.value)] = enum_to_code(member)
+    if ((codes == MISSING) & present).any():
+        raise ValueError(f"Column contains values that are not members of {enum_cls.__name__}!")
+    return codes
+
+
+def _numbers(values: Iterable[Any]) -> np.ndarray:
+    """
+    Converts a numeric column into an array, NULL values are encoded as `MISSING`.
+    """
+    values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=object)
+    values[values == None] = MISSING  # noqa: E711 (element-wise comparison)
+    return values.astype(np.int32)
+
+
+def from_columns(columns: Mapping[str, Iterable[Any]]) -> PlayerArrays:
+    """
+    Builds `PlayerArrays` from a columnar mapping of {column_name: column_values}.
+
+    Args:
+        columns (Mapping[str, Iterable[Any]]): one entry per field of `PlayerArrays`.
+            > enum columns may hold enum members, raw API values (e.g. "GOLD") or integer codes.
+            > None (NULL) values are encoded as `MISSING`.
+
+    Returns:
+        PlayerArrays: the encoded columns.
+    """
+    arrays = {}
+    for field in PlayerArrays._fields:
+        if field in _ENUM_COLUMNS:
+            arrays[field] = _encode(columns[field], _ENUM_COLUMNS[field])
+        else:
+            arrays[field] = _numbers(columns[field])
+    return PlayerArrays(**arrays)
+
+
+def load_player_arrays(
+    TableInstance: Optional[bot_declarative_base] = Player,
+    chunk_size: Optional[int] = 100_000,
+    session_creator: Optional[SessionCreator] = None,
+) -> PlayerArrays:
+    """
+    Loads the `players` table into `PlayerArrays`, streaming rows in chunks of [chunk_size].
+    Rows without queue, tier or division are left out, other NULL values are loaded as `MISSING`.
+
+    Args:
+        TableInstance (Optional[bot_declarative_base], optional): `Player` or `CompactPlayer`. Defaults to Player.
+        chunk_size (Optional[int], optional): amount of rows fetched & encoded at once. Defaults to 100_000.
+        session_creator (Optional[SessionCreator], optional): DB to read. Defaults to None (environment-configured DB).
+
+    Returns:
+        PlayerArrays: the encoded columns of the whole table.
+    """
+    chunks = []
+    with session_scope(session_creator) as session:
+        query = session.query(*[getattr(TableInstance, f) for f in PlayerArrays._fields]).filter(
+            *[getattr(TableInstance, f).isnot(None) for f in _REQUIRED_COLUMNS]
+        )
+        rows = iter(query.yield_per(chunk_size))
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            # transpose rows into columns and encode the whole chunk at once
+            chunks.append(from_columns(dict(zip(PlayerArrays._fields, zip(*chunk)))))
+    if not chunks:
+        return from_columns({field: [] for field in PlayerArrays._fields})
+    return PlayerArrays(*[np.concatenate(columns) for columns in zip(*chunks)])
+
+
+def dump_player_arrays(arrays: PlayerArrays, path: str) -> None:
+    """
+    Saves `PlayerArrays` as a columnar (`.npz`) dump.
+    """
+    np.savez_compressed(path, **arrays._asdict())
+
+
+def load_player_arrays_dump(path: str) -> PlayerArrays:
+    """
+    Loads `PlayerArrays` from a columnar (`.npz`) dump created by `dump_player_arrays`.
+    """
+    with np.load(path) as dump:
+        return PlayerArrays(**{field: dump[field] for field in PlayerArrays._fields})
+
+
+def _mask(
+    arrays: PlayerArrays,
+    server: Optional[Server] = None,
+    ranked_queue: Optional[RankedQueue] = None,
+) -> np.ndarray:
+    mask = np.ones(len(arrays.tier), dtype=bool)
+    if server is not None:
+        mask &= arrays.server == enum_to_code(server)
+    if ranked_queue is not None:
+        mask &= arrays.ranked_queue == enum_to_code(ranked_queue)
+    return mask
+
+
+def cell_counts(
+    arrays: PlayerArrays,
+    server: Optional[Server] = None,
+    ranked_queue: Optional[RankedQueue] = None,
+) -> np.ndarray:
+    """
+    Counts players per (tier, division) cell.
+
+    Returns:
+        np.ndarray: array of shape (len(Tier), len(Division)), indexed by enum codes.
+    """
+    mask = _mask(arrays, server=server, ranked_queue=ranked_queue)
+    cells = arrays.tier[mask].astype(np.int64) * len(Division) + arrays.division[mask]
+    return np.bincount(cells, minlength=len(Tier) * len(Division)).reshape(len(Tier), len(Division))
+
+
+def _to_ranked_distributions(counts: np.ndarray) -> Tuple[_RankedDistribution, ...]:
+    """
+    Converts (tier, division) counts into `_RankedDistribution` objects.
+    Shares are relative to ALL players counted (including challenger-esque tiers),
+    and are produced for the same tiers (and order) as the static distributions.
+    """
+    total = counts.sum()
+    shares = counts / total if total else np.zeros(counts.shape)
+    return tuple(
+        _RankedDistribution(
+            tier=static.tier,
+            division_distribution={
+                division: float(shares[enum_to_code(static.tier), enum_to_code(division)])
+                for division in static.distribution
+            },
+        )
+        for static in StaticRankedDistribution
+    )
+
+
+def ranked_distributions(
+    arrays: PlayerArrays,
+    server: Optional[Server] = None,
+    ranked_queue: Optional[RankedQueue] = None,
+) -> Tuple[_RankedDistribution, ...]:
+    """
+    Observed tier / division shares, optionally restricted to a server and / or queue.
+
+    Returns:
+        Tuple[_RankedDistribution, ...]: fresh counterpart of `rank_distributions.TotalDistribution`.
+    """
+    return _to_ranked_distributions(cell_counts(arrays, server=server, ranked_queue=ranked_queue))
+
+
+def ranked_distributions_per_server(
+    arrays: PlayerArrays, ranked_queue: Optional[RankedQueue] = None
+) -> Dict[Server, Tuple[_RankedDistribution, ...]]:
+    """
+    Observed tier / division shares for every server present in the data (single pass over the data).
+    Players without a known server are left out.
+
+    Returns:
+        Dict[Server, Tuple[_RankedDistribution, ...]]: {server: fresh ranked distributions}
+    """
+    mask = _mask(arrays, ranked_queue=ranked_queue) & (arrays.server != MISSING)
+    n_cells = len(Tier) * len(Division)
+    cells = (
+        arrays.server[mask].astype(np.int64) * n_cells
+        + arrays.tier[mask].astype(np.int64) * len(Division)
+        + arrays.division[mask]
+    )
+    counts = np.bincount(cells, minlength=len(Server) * n_cells).reshape(
+        len(Server), len(Tier), len(Division)
+    )
+    return {
+        server: _to_ranked_distributions(counts[enum_to_code(server)])
+        for server in Server
+        if counts[enum_to_code(server)].any()
+    }
+
+
+def server_distribution(
+    arrays: PlayerArrays, ranked_queue: Optional[RankedQueue] = None
+) -> ServerDistribution:
+    """
+    Observed share of players per server (players without a known server are left out).
+
+    Raises:
+        ValueError: if there are no players with a known server to compute a distribution from.
+
+    Returns:
+        ServerDistribution: fresh counterpart of `server_distributions.TotalDistribution`.
+    """
+    mask = _mask(arrays, ranked_queue=ranked_queue) & (arrays.server != MISSING)
+    if not mask.any():
+        raise ValueError("Cannot compute a server distribution without any players!")
+    counts = np.bincount(arrays.server[mask], minlength=len(Server))
+    return ServerDistribution(
+        server_distribution={server: int(counts[enum_to_code(server)]) for server in Server}
+    )
+
+
+def win_rate_histogram(
+    arrays: PlayerArrays,
+    bins: Optional[int] = 20,
+    min_games: Optional[int] = 1,
+    server: Optional[Server] = None,
+    ranked_queue: Optional[RankedQueue] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram of win-rates (wins / games) over [0, 1] for players with at least [min_games] games.
+    Players with unknown wins or losses are left out.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (counts, bin_edges) as returned by `np.histogram`.
+    """
+    games = arrays.wins + arrays.losses
+    mask = (
+        _mask(arrays, server=server, ranked_queue=ranked_queue)
+        & (arrays.wins != MISSING)
+        & (arrays.losses != MISSING)
+        & (games >= max(min_games, 1))
+    )
+    return np.histogram(arrays.wins[mask] / games[mask], bins=bins, range=(0.0, 1.0))
+
+
+def lp_histogram(
+    arrays: PlayerArrays,
+    bins: Optional[int] = 10,
+    server: Optional[Server] = None,
+    ranked_queue: Optional[RankedQueue] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram of league points over [0, 100] (the LP range of a division).
+    Players with unknown league points are left out.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (counts, bin_edges) as returned by `np.histogram`.
+    """
+    mask = _mask(arrays, server=server, ranked_queue=ranked_queue) & (arrays.league_points != MISSING)
+    return np.histogram(arrays.league_points[mask], bins=bins, range=(0, 100))
+
+
+def ranked_drift(
+    observed: Iterable[_RankedDistribution],
+    static: Optional[Iterable[_RankedDistribution]] = StaticRankedDistribution,
+) -> Dict[Tier, Dict[Division, float]]:
+    """
+    Drift (observed - static share) per tier and division.
+
+    Returns:
+        Dict[Tier, Dict[Division, float]]: positive values mean the cell is bigger than assumed.
+    """
+    static_by_tier = {d.tier: d.distribution for d in static}
+    return {
+        d.tier: {
+            division: share - static_by_tier.get(d.tier, {}).get(division, 0.0)
+            for division, share in d.distribution.items()
+        }
+        for d in observed
+    }
+
+
+def server_drift(
+    observed: ServerDistribution,
+    static: Optional[ServerDistribution] = StaticServerDistribution,
+) -> Dict[Server, float]:
+    """
+    Drift (observed - static share) per server.
+
+    Returns:
+        Dict[Server, float]: positive values mean the server is bigger than assumed.
+    """
+    return {
+        server: getattr(observed, server.name, 0.0) - getattr(static, server.name, 0.0)
+        for server in Server
+    }
@@ -1,6 +1,11 @@
-from typing import Mapping, Any, Optional, Generator, List
+from typing import Mapping, Any, Optional, Generator, List, Dict, Set, Tuple
+import queue
+import threading
 from .database_orm import bot_declarative_base
-from .database_orm.session.session_handler import session_scope
+from .database_orm.session.session_handler import session_scope, SessionCreator
+from .database_orm.session.shard_router import ShardRouter
+from utils.enums import Server
+from utils.profiling import profiled
 
 
 class BaseDataBuffer:
@@ -27,6 +32,7 @@ class BaseDataBuffer:
     def empty(self):
         return len(self.data) == 0
 
+    @profiled("buffer_add")
     def add(self, new_data: List[Mapping[str, Any]]) -> None:
         """
         Interface to add new data to the buffer.
@@ -122,16 +128,26 @@ class DatabaseBuffer(BaseDataBuffer):
 
     Args:
         TableInstance (bot_declarative_base): table_space that inherits from a declarative base.
+        session_creator (Optional[SessionCreator], optional): DB to save to. Defaults to None.
+            > if not provided, the environment-configured DB is used.
     """
 
-    def __init__(self, TableInstance: bot_declarative_base, *args, **kwargs) -> None:
+    def __init__(
+        self,
+        TableInstance: bot_declarative_base,
+        *args,
+        session_creator: Optional[SessionCreator] = None,
+        **kwargs,
+    ) -> None:
         self.TableInstance = TableInstance
+        self.session_creator = session_creator
         # the method name on the TableInstance class that converts a raw API Dict-like response to an instance of the table.
         self._converter_field_name = "_from_api_dict"
         super().__init__(*args, **kwargs)
 
+    @profiled("save")
     def save(self):
-        with session_scope() as session:
+        with session_scope(self.session_creator) as session:
             # if we can map the Dict[] instances in our `data` field, use the converter method
             if hasattr(self.TableInstance, self._converter_field_name):
                 instances = [
@@ -143,3 +159,146 @@ class DatabaseBuffer(BaseDataBuffer):
 
             # save them all to the table
             session.add_all(instances)
+
+
+# end a shard writer, with / without saving what is left in its buffer
+_SAVE_AND_STOP = object()
+_STOP = object()
+
+
+class _ShardWriter:
+    """
+    Writer thread of a single shard: adds the data queued for its server to its `DatabaseBuffer`
+    (i.e. converts & saves it). Errors are kept to be raised by the `ShardedDatabaseBuffer`.
+    """
+
+    def __init__(self, buffer: DatabaseBuffer, name: str, max_pending: int) -> None:
+        self.buffer = buffer
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            data = self.queue.get()
+            if data is _SAVE_AND_STOP or data is _STOP:
+                break
+            if self.error is None:
+                try:
+                    self.buffer.add(data)
+                except Exception as e:
+                    # keep draining the queue, so adding never blocks on a failed writer
+                    self.error = e
+        if data is _SAVE_AND_STOP and self.error is None:
+            try:
+                self.buffer.save_and_flush()
+            except Exception as e:
+                self.error = e
+
+    def close(self, save: bool) -> None:
+        self.queue.put(_SAVE_AND_STOP if save else _STOP)
+        self.thread.join()
+
+
+class ShardedDatabaseBuffer:
+    """
+    Routes data to one `DatabaseBuffer` per `Server`, each saving to its own shard (see `ShardRouter`).
+    Every shard is written by its own writer thread, so shards are converted & committed in parallel
+    while the caller keeps adding (e.g. the consumer of a `ResilientCrawler`).
+    An error of a writer is raised by the next `add()` (or when exiting).
+
+    Args:
+        TableInstance (bot_declarative_base): table_space that inherits from a declarative base.
+        router (ShardRouter): Router that maps a `Server` to its database.
+        batch_size (Optional[int], optional): batch size of every per-server buffer. Defaults to 0.
+        max_pending (Optional[int], optional): added blocks of data waiting per shard before `add()` blocks.
+            Defaults to 64.
+    """
+
+    def __init__(
+        self,
+        TableInstance: bot_declarative_base,
+        router: ShardRouter,
+        batch_size: Optional[int] = 0,
+        max_pending: Optional[int] = 64,
+    ) -> None:
+        self.TableInstance = TableInstance
+        self.router = router
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.buffers: Dict[Server, DatabaseBuffer] = {}
+        self._writers: Dict[Server, _ShardWriter] = {}
+        self._lock = threading.Lock()
+
+    def buffer_for(self, server: Server) -> DatabaseBuffer:
+        """
+        Returns (and lazily creates) the buffer that writes to the shard of `server`, with its writer thread.
+        """
+        with self._lock:
+            if server not in self.buffers:
+                self.buffers[server] = DatabaseBuffer(
+                    TableInstance=self.TableInstance,
+                    session_creator=self.router.session_creator(server),
+                    batch_size=self.batch_size,
+                )
+                self._writers[server] = _ShardWriter(
+                    self.buffers[server], name=f"shard-writer-{server.name}", max_pending=self.max_pending
+                )
+            return self.buffers[server]
+
+    def add(self, new_data: List[Mapping[str, Any]], server: Server) -> None:
+        """
+        Interface to add new data (fetched from `server`) to the buffer of its shard.
+        Returns once the data is queued, it is saved by the shard's writer thread.
+        """
+        self.buffer_for(server)
+        writer = self._writers[server]
+        if writer.error is not None:
+            raise writer.error
+        writer.queue.put(new_data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> Optional[bool]:
+        """
+        Waits for every writer, which saves whatever is left in its buffer (unless exited because of an error).
+        """
+        for writer in self._writers.values():
+            writer.close(save=not exc_type)
+        if exc_type:
+            return False
+
+        for writer in self._writers.values():
+            if writer.error is not None:
+                raise writer.error
+
+
+class DuplicateFilter:
+    """
+    Drops league entries whose (server, queue, summoner) was seen before, i.e. that would violate
+    the unique constraint of the players tables. On a live ladder, a summoner can show up on two pages
+    when their LP changes mid-crawl.
+    Keeps one key per distinct entry in memory.
+    """
+
+    def __init__(self) -> None:
+        self._seen: Set[Tuple[Server, str, str]] = set()
+
+    def __call__(self, entries: List[Mapping[str, Any]], server: Server) -> List[Mapping[str, Any]]:
+        """
+        Args:
+            entries (List[Mapping[str, Any]]): raw league entries, as returned by the API.
+            server (Server): server the entries were fetched from.
+
+        Returns:
+            List[Mapping[str, Any]]: the entries that were not seen before (in order).
+        """
+        unseen = []
+        for entry in entries:
+            key = (server, entry["queueType"], entry["summonerId"])
+            if key not in self._seen:
+                self._seen.add(key)
+                unseen.append(entry)
+        return unseen
@@ -1,9 +1,11 @@
 import os
+from typing import Optional, List
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 import sqlalchemy.orm
 from sqlalchemy.ext.declarative import declarative_base
+from utils.profiling import profiler
 
 # Declarative base that is being used by all our DB interfaces
 _CONN_STRING_ENV_NAME = "RIOT_DATA_DUMP_DB_CONNECTION_STRING"
@@ -16,9 +18,20 @@ class SessionCreator:
     """
     Singleton class to initiate a DB session only when upon instantiation;
     otherwise, refers to an on-going session.
+
+    Args:
+        db_string (Optional[str], optional): Explicit SQLAlchemy connection string. Defaults to None.
+            > if not provided, the connection string is read from the environment.
+        create_tables (Optional[bool], optional): create missing tables on first use. Defaults to True.
+            > disable to only read from an existing database.
     """
 
     _session_creator = None
+    _engine = None
+
+    def __init__(self, db_string: Optional[str] = None, create_tables: Optional[bool] = True) -> None:
+        self.db_string = db_string
+        self.create_tables = create_tables
 
     @property
     def session_creator(self) -> sqlalchemy.orm.session.Session:
@@ -30,26 +43,58 @@ class SessionCreator:
             self._initialize_database_interface()
         return self._session_creator
 
+    @property
+    def engine(self) -> sqlalchemy.engine.Engine:
+        """
+        Returns:
+            sqlalchemy.engine.Engine: engine the sessions are bound to.
+        """
+        if not self._engine:
+            self._initialize_database_interface()
+        return self._engine
+
     def _initialize_database_interface(self):
         """
         Initializes our DB interface through sqlalchemy
         """
         # create DB engine
         # connection string abstraced into environment to make DB agnostic
-        _db_string = (
+        _db_string = self.db_string or (
             "sqlite://" if os.environ.get(_TEST_ENV_NAME) else os.environ.get(_CONN_STRING_ENV_NAME)
         )
         if not _db_string:
             raise AttributeError(
                 f"You need to define a valid DB connection string under env variable `{_CONN_STRING_ENV_NAME}`"
             )
-        engine = create_engine(_db_string)
+        self._engine = create_engine(_db_string)
 
         # create all required tables from the "tables" module
-        bot_declarative_base.metadata.create_all(bind=engine)
+        if self.create_tables:
+            bot_declarative_base.metadata.create_all(bind=self._engine)
 
         # Initial creation of the SessionMaker
-        self._session_creator = sqlalchemy.orm.sessionmaker(bind=engine)
+        self._session_creator = sqlalchemy.orm.sessionmaker(bind=self._engine)
+
+    def create_missing_indexes(self) -> List[str]:
+        """
+        `create_all` only creates the indexes of new tables, so indexes declared after a table was created
+        (e.g. on a database from before they existed) are created here. Can take a while on large tables.
+
+        Returns:
+            List[str]: names of the created indexes.
+        """
+        inspector = inspect(self.engine)
+        existing_tables = set(inspector.get_table_names())
+        created = []
+        for table in bot_declarative_base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                if index.name not in existing_indexes:
+                    index.create(bind=self.engine)
+                    created.append(index.name)
+        return created
 
 
 # Singleton instantiation
@@ -57,17 +102,22 @@ session_creator = SessionCreator()
 
 
 @contextmanager
-def session_scope():
+def session_scope(creator: Optional[SessionCreator] = None):
     """
     Provides a transactional scope for DB operations.
+
+    Args:
+        creator (Optional[SessionCreator], optional): Session creator to use. Defaults to None.
+            > if not provided, the singleton `session_creator` (environment-configured DB) is used.
     """
     # call the session_creator property to get the current DB session
-    session = session_creator.session_creator()
+    session = (creator or session_creator).session_creator()
 
     try:
         yield session
         # try to commit changes created in context
-        session.commit()
+        with profiler.stage("commit"):
+            session.commit()
     except Exception as e:
         # base exception sucks, but chosen in favor of not blocking the DB at runtime
         # roll back the changes, then propagate the exception
@@ -0,0 +1,241 @@
+import os
+import csv
+import threading
+from typing import Optional, Dict, Iterable, Generator, Tuple, Any, Callable, List
+
+import sqlalchemy.orm
+from sqlalchemy import inspect, create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import OperationalError
+
+from .session_handler import SessionCreator, session_scope
+from utils.enums import Server
+
+_SHARD_TEMPLATE_ENV_NAME = "RIOT_DATA_DUMP_DB_SHARD_TEMPLATE"
+_SERVER_PLACEHOLDER = "{server}"
+
+
+def _merged_columns(TableInstance) -> List[str]:
+    """
+    Columns of a table in the merged view: primary & foreign keys are left out (they are only unique within a shard).
+    """
+    return [
+        attr.key
+        for attr in inspect(TableInstance).column_attrs
+        if not any(c.primary_key or c.foreign_keys for c in attr.columns)
+    ]
+
+
+class ShardRouter:
+    """
+    Maps every `Server` to its own database (shard), e.g. one SQLite file per region.
+    Each shard has its own engine, so regional crawls can write in parallel without lock contention.
+
+    Args:
+        connection_template (Optional[str], optional): SQLAlchemy connection string containing `{server}`,
+            e.g. `sqlite:///players_{server}.db`. Defaults to None.
+            > if not provided, the template is read from the environment.
+            > `sqlite://` (in-memory) is accepted without placeholder, every shard is a separate in-memory DB.
+        servers (Optional[Iterable[Server]], optional): servers that may have a shard. Defaults to None (all).
+            > only these are looked up by the merged read views.
+    """
+
+    def __init__(
+        self,
+        connection_template: Optional[str] = None,
+        servers: Optional[Iterable[Server]] = None,
+    ) -> None:
+        self.connection_template = connection_template or os.environ.get(_SHARD_TEMPLATE_ENV_NAME)
+        if not self.connection_template:
+            raise AttributeError(
+                f"You need to define a shard connection template under env variable `{_SHARD_TEMPLATE_ENV_NAME}`"
+            )
+        if (
+            _SERVER_PLACEHOLDER not in self.connection_template
+            and self.connection_template != "sqlite://"
+        ):
+            raise ValueError(
+                f"Shard connection template needs to contain `{_SERVER_PLACEHOLDER}`, got `{self.connection_template}`"
+            )
+        self.candidate_servers = tuple(servers) if servers is not None else tuple(Server)
+        self._session_creators: Dict[Server, SessionCreator] = {}
+        # read-only access to shards that exist, but have not been opened for writing
+        self._readers: Dict[Server, SessionCreator] = {}
+        self._lock = threading.Lock()
+
+    def connection_string(self, server: Server) -> str:
+        """
+        Connection string of the shard for `server` (uses the lower-case enum name, e.g. `euw`).
+        """
+        return self.connection_template.replace(_SERVER_PLACEHOLDER, server.name.lower())
+
+    def session_creator(self, server: Server) -> SessionCreator:
+        """
+        Returns (and lazily creates) the session creator bound to the shard of `server`.
+        """
+        with self._lock:
+            if server not in self._session_creators:
+                self._session_creators[server] = SessionCreator(
+                    db_string=self.connection_string(server)
+                )
+            return self._session_creators[server]
+
+    def session_scope(self, server: Server):
+        """
+        Provides a transactional scope for DB operations on the shard of `server`.
+        """
+        return session_scope(self.session_creator(server))
+
+    @property
+    def servers(self) -> Tuple[Server, ...]:
+        """
+        Servers whose shard has been opened by this router.
+        """
+        return tuple(self._session_creators)
+
+    def _shard_exists(self, server: Server) -> bool:
+        """
+        Whether the shard of `server` exists, without creating it.
+        """
+        url = make_url(self.connection_string(server))
+        if url.get_backend_name() == "sqlite":
+            # in-memory shards only exist while opened
+            return bool(url.database) and url.database != ":memory:" and os.path.exists(url.database)
+        engine = create_engine(url)
+        try:
+            engine.connect().close()
+            return True
+        except OperationalError:
+            return False
+        finally:
+            engine.dispose()
+
+    def existing_servers(self, servers: Optional[Iterable[Server]] = None) -> Tuple[Server, ...]:
+        """
+        Servers (of [servers], defaults to `candidate_servers`) whose shard exists,
+        either opened by this router or created before.
+        """
+        return tuple(
+            server
+            for server in (self.candidate_servers if servers is None else servers)
+            if server in self._session_creators or self._shard_exists(server)
+        )
+
+    def _reader(self, server: Server) -> SessionCreator:
+        """
+        Session creator to read the shard of `server`, that does not create any schema.
+        """
+        with self._lock:
+            if server in self._session_creators:
+                return self._session_creators[server]
+            if server not in self._readers:
+                self._readers[server] = SessionCreator(
+                    db_string=self.connection_string(server), create_tables=False
+                )
+            return self._readers[server]
+
+    def query_all(
+        self,
+        build_query: Callable[[sqlalchemy.orm.Session], sqlalchemy.orm.Query],
+        servers: Optional[Iterable[Server]] = None,
+        table_name: Optional[str] = None,
+    ) -> Generator[Tuple[Server, Any], None, None]:
+        """
+        Merged read view over shards: runs the same query on every shard and chains the results.
+        Shards are only read, never created (missing shards are skipped).
+
+        Args:
+            build_query (Callable[[Session], Query]): builds the query to run, given a shard's session.
+            servers (Optional[Iterable[Server]], optional): shards to read. Defaults to None (all existing shards).
+            table_name (Optional[str], optional): skip shards without this table. Defaults to None.
+
+        Yields:
+            Generator[Tuple[Server, Any], None, None]: (server of the shard, result row)
+        """
+        for server in self.existing_servers(servers):
+            reader = self._reader(server)
+            if table_name is not None and not reader.engine.has_table(table_name):
+                continue
+            with session_scope(reader) as session:
+                for row in build_query(session):
+                    yield server, row
+
+    def merged_rows(
+        self, TableInstance, servers: Optional[Iterable[Server]] = None
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Merged read view of a table over shards, as {column: value} mappings.
+        Primary & foreign keys are left out (they are only unique within a shard),
+        the `server` column (if present) is filled in from the shard the row lives in.
+
+        Args:
+            TableInstance (bot_declarative_base): table to read.
+            servers (Optional[Iterable[Server]], optional): shards to read. Defaults to None (all existing shards).
+
+        Yields:
+            Generator[Dict[str, Any], None, None]: one mapping per row.
+        """
+        columns = _merged_columns(TableInstance)
+        for server, row in self.query_all(
+            lambda s: s.query(TableInstance), servers=servers, table_name=TableInstance.__tablename__
+        ):
+            values = {c: getattr(row, c) for c in columns}
+            if "server" in values:
+                values["server"] = server
+            yield values
+
+    def export_csv(
+        self, path: str, TableInstance, servers: Optional[Iterable[Server]] = None
+    ) -> int:
+        """
+        Exports a table of all shards into a single csv file.
+        The `server` column (if present) is filled in from the shard the row lives in.
+
+        Args:
+            path (str): path of the csv file to write.
+            TableInstance (bot_declarative_base): table to export.
+            servers (Optional[Iterable[Server]], optional): shards to export. Defaults to None (all existing shards).
+
+        Returns:
+            int: amount of exported rows.
+        """
+        n_rows = 0
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=_merged_columns(TableInstance))
+            writer.writeheader()
+            for values in self.merged_rows(TableInstance, servers=servers):
+                # enums are exported by their API value
+                writer.writerow({k: getattr(v, "value", v) for k, v in values.items()})
+                n_rows += 1
+        return n_rows
+
+    def merge_into(
+        self,
+        TableInstance,
+        target: Optional[SessionCreator] = None,
+        servers: Optional[Iterable[Server]] = None,
+        batch_size: Optional[int] = 10_000,
+    ) -> int:
+        """
+        Copies a table of all shards into a single database.
+
+        Args:
+            TableInstance (bot_declarative_base): table to merge.
+            target (Optional[SessionCreator], optional): DB to merge into. Defaults to None (environment-configured DB).
+            servers (Optional[Iterable[Server]], optional): shards to merge. Defaults to None (all existing shards).
+            batch_size (Optional[int], optional): rows inserted per statement. Defaults to 10_000.
+
+        Returns:
+            int: amount of merged rows.
+        """
+        n_rows, batch = 0, []
+        with session_scope(target) as session:
+            for values in self.merged_rows(TableInstance, servers=servers):
+                batch.append(values)
+                if len(batch) >= batch_size:
+                    session.bulk_insert_mappings(TableInstance, batch)
+                    n_rows, batch = n_rows + len(batch), []
+            if batch:
+                session.bulk_insert_mappings(TableInstance, batch)
+                n_rows += len(batch)
+        return n_rows
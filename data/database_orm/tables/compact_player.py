@@ -0,0 +1,126 @@
+from typing import Mapping, Any, Type, Optional, Dict
+import enum
+from sqlalchemy import Column, String, Integer, SmallInteger, Boolean, UniqueConstraint, Index
+from sqlalchemy.types import TypeDecorator
+from .. import bot_declarative_base
+from .player import Player
+from utils.enums import Tier, Division, RankedQueue, Server, enum_to_code, code_to_enum
+from utils.profiling import profiled
+
+# LP never reaches this within a single (tier, division), so rank scores of different divisions never overlap
+_LP_RANGE = 10_000
+
+
+class CodedEnum(TypeDecorator):
+    """
+    Stores an enum member as its `SmallInteger` code (see `utils.enums.enum_to_code`).
+    On the python side, the column still holds regular enum members.
+
+    Args:
+        enum_cls (Type[enum.Enum]): The enum this column holds members of.
+    """
+
+    impl = SmallInteger
+
+    def __init__(self, enum_cls: Type[enum.Enum], *args, **kwargs) -> None:
+        self.enum_cls = enum_cls
+        super().__init__(*args, **kwargs)
+
+    def process_bind_param(self, value: Optional[Any], dialect) -> Optional[int]:
+        if value is None or isinstance(value, int):
+            return value
+        return enum_to_code(self.enum_cls(value))
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[enum.Enum]:
+        if value is None:
+            return value
+        return code_to_enum(self.enum_cls, value)
+
+
+def rank_score(tier: Tier, division: Division, league_points: int) -> int:
+    """
+    Derives a single sortable score from a rank: the higher the score, the higher the rank.
+    Example:
+        (Tier.GOLD, Division.TWO, 42) > (Tier.GOLD, Division.THREE, 99) > (Tier.SILVER, Division.ONE, 100)
+
+    Args:
+        tier (Tier): Tier enum member (e.g. Tier.GOLD).
+        division (Division): Division enum member (e.g. Division.TWO).
+        league_points (int): LP within the division.
+
+    Returns:
+        int: the sortable rank score.
+    """
+    # enums are defined from highest to lowest rank > invert their codes
+    tier_level = len(Tier) - 1 - enum_to_code(tier)
+    division_level = len(Division) - 1 - enum_to_code(division)
+    return (tier_level * len(Division) + division_level) * _LP_RANGE + (league_points or 0)
+
+
+class CompactPlayer(bot_declarative_base):
+    """
+    Opt-in, compact counterpart of `Player` for very large datasets.
+    Enums are stored as `SmallInteger` codes and a sortable `rank_score` is derived on insertion.
+    Use it by passing it as the `TableInstance` of a `DatabaseBuffer` (the table is only created once imported).
+    """
+
+    __tablename__ = "players_compact"
+
+    id = Column(Integer, primary_key=True)
+    league_id = Column(String)
+    # ENUMS (stored as integer codes)
+    server = Column(CodedEnum(Server))
+    ranked_queue = Column(CodedEnum(RankedQueue))
+    tier = Column(CodedEnum(Tier))
+    division = Column(CodedEnum(Division))
+    # derived from (tier, division, league_points), see `rank_score`
+    rank_score = Column(Integer)
+    # Return fields
+    summoner_id = Column(String)
+    summoner_name = Column(String)
+    league_points = Column(Integer)
+    wins = Column(Integer)
+    losses = Column(Integer)
+    is_veteran = Column(Boolean)
+    is_inactive = Column(Boolean)
+    is_fresh_blood = Column(Boolean)
+    is_hot_streak = Column(Boolean)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "server", "summoner_id", "ranked_queue", name="_one_compact_entry_per_server_queue_uc"
+        ),
+        Index("ix_players_compact_cell", "server", "ranked_queue", "tier", "division"),
+        Index("ix_players_compact_rank", "server", "ranked_queue", "rank_score"),
+        Index("ix_players_compact_summoner_id", "summoner_id"),
+        Index("ix_players_compact_summoner_name", "summoner_name"),
+    )
+
+    @classmethod
+    def _api_dict_to_fields(cls, league_entry_DTO: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Maps a list-member(!) of the raw response of the Riot API `GET getLeagueEntries` endpoint
+        to a mapping of {table_field_name: value}, including the derived `rank_score`.
+
+        Returns:
+            Dict[str, Any]: keyword arguments to instantiate a table row with.
+        """
+        new_instance = Player._api_dict_to_fields(league_entry_DTO)
+        new_instance["rank_score"] = rank_score(
+            tier=new_instance["tier"],
+            division=new_instance["division"],
+            league_points=new_instance["league_points"],
+        )
+        return new_instance
+
+    @classmethod
+    @profiled("from_api_dict")
+    def _from_api_dict(cls, league_entry_DTO: Mapping[str, Any]) -> "CompactPlayer":
+        """
+        Instantiates a `CompactPlayer` object from a list-member(!)
+        of the raw response of the Riot API `GET getLeagueEntries` endpoint.
+
+        Returns:
+            CompactPlayer: The generated `CompactPlayer` instance.
+        """
+        return cls(**cls._api_dict_to_fields(league_entry_DTO))
@@ -1,8 +1,18 @@
-from typing import Mapping, Any, Tuple
-from sqlalchemy import Column, String, Enum, Integer, Boolean, ForeignKey, UniqueConstraint
+from typing import Mapping, Any, Tuple, Dict
+from sqlalchemy import (
+    Column,
+    String,
+    Enum,
+    Integer,
+    Boolean,
+    ForeignKey,
+    UniqueConstraint,
+    Index,
+)
 from sqlalchemy.orm import relationship, class_mapper
 from .. import bot_declarative_base
 from utils.enums import Tier, Division, RankedQueue, Server
+from utils.profiling import profiled
 from collections import namedtuple
 
 EnumFieldMap = namedtuple("EnumFieldMap", ("leagueEntryDTOName", "alias", "enum"))
@@ -46,6 +56,10 @@ class Player(bot_declarative_base):
         UniqueConstraint(
             "server", "summoner_id", "ranked_queue", name="_one_entry_per_server_queue_uc"
         ),
+        # the planner / analytics filter on whole (server, queue, tier, division) cells
+        Index("ix_players_cell", "server", "ranked_queue", "tier", "division"),
+        Index("ix_players_summoner_id", "summoner_id"),
+        Index("ix_players_summoner_name", "summoner_name"),
     )
 
     @classmethod
@@ -65,6 +79,8 @@ class Player(bot_declarative_base):
             "summonerId": "summoner_id",
             "summonerName": "summoner_name",
             "leaguePoints": "league_points",
+            "wins": "wins",
+            "losses": "losses",
             "veteran": "is_veteran",
             "inactive": "is_inactive",
             "freshBlood": "is_fresh_blood",
@@ -72,13 +88,13 @@ class Player(bot_declarative_base):
         }
 
     @classmethod
-    def _from_api_dict(cls, league_entry_DTO: Mapping[str, Any]) -> "Player":
+    def _api_dict_to_fields(cls, league_entry_DTO: Mapping[str, Any]) -> Dict[str, Any]:
         """
-        Instantiates a `Player` object from a list-member(!)
-        of the raw response of the Riot API `GET getLeagueEntries` endpoint.
+        Maps a list-member(!) of the raw response of the Riot API `GET getLeagueEntries` endpoint
+        to a mapping of {table_field_name: value}.
 
         Returns:
-            Player: The generated `Player` instance.
+            Dict[str, Any]: keyword arguments to instantiate a table row with.
         """
         new_instance = {}
         mapper = cls._api_model_map()
@@ -86,8 +102,22 @@ class Player(bot_declarative_base):
             new_instance[v] = league_entry_DTO.pop(k)
         for field in _ENUM_FIELDS:
             new_instance[field.alias] = field.enum(league_entry_DTO.pop(field.leagueEntryDTOName))
+        # the server is not part of the API response, but can be attached by the caller
+        if "server" in league_entry_DTO:
+            new_instance["server"] = Server(league_entry_DTO.pop("server"))
+        return new_instance
 
-        return cls(**new_instance)
+    @classmethod
+    @profiled("from_api_dict")
+    def _from_api_dict(cls, league_entry_DTO: Mapping[str, Any]) -> "Player":
+        """
+        Instantiates a `Player` object from a list-member(!)
+        of the raw response of the Riot API `GET getLeagueEntries` endpoint.
+
+        Returns:
+            Player: The generated `Player` instance.
+        """
+        return cls(**cls._api_dict_to_fields(league_entry_DTO))
 
 
 class MiniSeries(bot_declarative_base):
@@ -0,0 +1,57 @@
+from typing import Mapping, Any, Dict
+from sqlalchemy import Column, String, Enum, Integer, DateTime, UniqueConstraint, Index
+from .. import bot_declarative_base
+from utils.enums import Server
+
+
+class Summoner(bot_declarative_base):
+    """
+    Account information of a summoner (from the Riot API `summoner-v4`), enriching `Player` rows.
+    Doubles as a local cache: `fetched_at` decides whether an entry needs to be refreshed.
+    """
+
+    __tablename__ = "summoners"
+
+    id = Column(Integer, primary_key=True)
+    server = Column(Enum(Server))
+    summoner_id = Column(String)
+    puuid = Column(String)
+    account_id = Column(String)
+    summoner_level = Column(Integer)
+    fetched_at = Column(DateTime)
+
+    # a summoner ID is only unique within a server
+    __table_args__ = (
+        UniqueConstraint("server", "summoner_id", name="_one_summoner_per_server_uc"),
+        Index("ix_summoners_puuid", "puuid"),
+    )
+
+    @classmethod
+    def _api_model_map(cls) -> Mapping[str, str]:
+        """
+        Produces an internal mapping of named fields from the API response to named fields of this table.
+        Format:
+            {
+                "key_in_api_response_body": "table_field_name"
+            }
+
+        Returns:
+            Mapping[str, str]: mapping of API response fields to table fields.
+        """
+        return {
+            "id": "summoner_id",
+            "puuid": "puuid",
+            "accountId": "account_id",
+            "summonerLevel": "summoner_level",
+        }
+
+    @classmethod
+    def _api_dict_to_fields(cls, summoner_DTO: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Maps the raw response of the Riot API `GET getBySummonerId` endpoint
+        to a mapping of {table_field_name: value}.
+
+        Returns:
+            Dict[str, Any]: keyword arguments to instantiate a table row with.
+        """
+        return {v: summoner_DTO.get(k) for k, v in cls._api_model_map().items()}
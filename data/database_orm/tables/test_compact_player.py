@@ -0,0 +1,92 @@
+from utils.testing import league_entry
+
+
+def _get_session():
+    """
+    Creates a session on a fresh in-memory sqlite database (independent from the application's DB interface).
+    """
+    from sqlalchemy import create_engine
+    import sqlalchemy.orm
+    from .. import bot_declarative_base
+    from . import compact_player  # noqa: F401 (registers the opt-in table)
+
+    engine = create_engine("sqlite://")
+    bot_declarative_base.metadata.create_all(bind=engine)
+    return sqlalchemy.orm.sessionmaker(bind=engine)(), engine
+
+
+def test_rank_score_is_sortable():
+    """
+    Test that the rank score orders by tier, then division, then LP.
+    """
+    from .compact_player import rank_score
+    from utils.enums import Tier, Division
+
+    ranks = [
+        (Tier.IRON, Division.FOUR, 0),
+        (Tier.IRON, Division.FOUR, 99),
+        (Tier.IRON, Division.ONE, 0),
+        (Tier.SILVER, Division.FOUR, 0),
+        (Tier.GOLD, Division.TWO, 42),
+        (Tier.CHALLENGER, Division.ONE, 1_500),
+    ]
+    scores = [rank_score(*rank) for rank in ranks]
+    assert scores == sorted(scores) and len(set(scores)) == len(scores)
+
+
+def test_compact_player_stores_integer_codes():
+    """
+    Test that enums are stored as integer codes but read back as enum members.
+    """
+    from .compact_player import CompactPlayer
+    from utils.enums import Server, Tier, Division, RankedQueue, enum_to_code
+
+    session, engine = _get_session()
+    players = [
+        CompactPlayer._from_api_dict(league_entry("a", tier="GOLD", rank="II", league_points=42)),
+        CompactPlayer._from_api_dict(league_entry("b", tier="SILVER", rank="I", league_points=99)),
+        CompactPlayer._from_api_dict(league_entry("c", tier="GOLD", rank="I", league_points=0)),
+    ]
+    for player in players:
+        player.server = Server.EUW
+    session.add_all(players)
+    session.commit()
+
+    raw = engine.execute("SELECT server, tier, division FROM players_compact ORDER BY id").fetchall()
+    assert tuple(raw[0]) == tuple(enum_to_code(m) for m in (Server.EUW, Tier.GOLD, Division.TWO))
+
+    query = session.query(CompactPlayer).filter(
+        CompactPlayer.server == Server.EUW,
+        CompactPlayer.ranked_queue == RankedQueue.SOLO_DUO,
+        CompactPlayer.tier == Tier.GOLD,
+    )
+    assert {p.summoner_id for p in query} == {"a", "c"}
+    by_rank = session.query(CompactPlayer).order_by(CompactPlayer.rank_score.desc()).all()
+    assert [p.summoner_id for p in by_rank] == ["c", "a", "b"]
+    assert by_rank[0].division is Division.ONE
+    session.close()
+
+
+def test_indexes_are_added_to_existing_tables():
+    """
+    Test that the declared indexes are created on a `players` table that predates them.
+    """
+    from sqlalchemy import create_engine, inspect
+    from ..session.session_handler import SessionCreator
+    import tempfile
+    import os
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_string = f"sqlite:///{os.path.join(directory, 'old.db')}"
+        SessionCreator(db_string=db_string).engine.dispose()
+        # simulate a database created before the indexes were declared
+        engine = create_engine(db_string)
+        for name in ("ix_players_cell", "ix_players_summoner_id", "ix_players_summoner_name"):
+            engine.execute(f"DROP INDEX {name}")
+        engine.dispose()
+
+        creator = SessionCreator(db_string=db_string)
+        created = creator.create_missing_indexes()
+        assert {"ix_players_cell", "ix_players_summoner_id", "ix_players_summoner_name"} <= set(created)
+        assert "ix_players_summoner_id" in {i["name"] for i in inspect(creator.engine).get_indexes("players")}
+        assert creator.create_missing_indexes() == []
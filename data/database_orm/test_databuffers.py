@@ -26,7 +26,7 @@ def test_database_buffer():
     from ..data_buffers import DatabaseBuffer
     from ..database_orm.tables.player import Player
     from .session.session_handler import session_scope
-    from api_interface.league_entries import EntryFetcher, _TESTING_PURPOSES_EF_PARAMS
+    from api_interface.league_entries import EntryFetcher, _testing_purposes_ef_params
     from riotwatcher import LolWatcher
     import math
 
@@ -36,7 +36,7 @@ def test_database_buffer():
 
     with DatabaseBuffer(TableInstance=Player, batch_size=16) as buffer:
         # slighty interference with another test here (`EntryFetcher` test), but should be fine
-        ef = EntryFetcher(**_TESTING_PURPOSES_EF_PARAMS)
+        ef = EntryFetcher(**_testing_purposes_ef_params())
         for idx, entries in enumerate(ef):
             buffer.add(entries)
     # check that the buffer was saved and flushed in correct amount of batches
@@ -49,3 +49,38 @@ def test_database_buffer():
         # (specifically checks DatabaseBuffer.save() function)
         assert players
         assert len(players) == ef.max_entries
+
+
+def test_duplicate_filter_with_overlapping_pages():
+    """
+    Test that a summoner showing up on two pages (LP changed mid-crawl) is only saved once.
+    """
+    from ..data_buffers import DatabaseBuffer, DuplicateFilter
+    from ..database_orm.tables.player import Player
+    from .session.session_handler import SessionCreator, session_scope
+    from sqlalchemy.exc import IntegrityError
+    from utils.enums import Server
+    from utils.testing import league_entry
+
+    def _page(summoner_ids):
+        return [league_entry(summoner_id, server=Server.EUW) for summoner_id in summoner_ids]
+
+    pages = [_page(["a", "b", "c"]), _page(["c", "d"])]
+    try:
+        with DatabaseBuffer(TableInstance=Player, session_creator=SessionCreator(db_string="sqlite://")) as buffer:
+            for page in pages:
+                buffer.add(page)
+        assert False, "overlapping pages violate the unique constraint"
+    except IntegrityError:
+        pass
+
+    pages = [_page(["a", "b", "c"]), _page(["c", "d"])]
+    creator = SessionCreator(db_string="sqlite://")
+    unseen = DuplicateFilter()
+    with DatabaseBuffer(TableInstance=Player, session_creator=creator, batch_size=2) as buffer:
+        for page in pages:
+            buffer.add(unseen(page, server=Server.EUW))
+    with session_scope(creator) as session:
+        assert sorted(p.summoner_id for p in session.query(Player)) == ["a", "b", "c", "d"]
+    # the same summoner on another server (or queue) is a different entry
+    assert len(unseen(_page(["a"]), server=Server.NA)) == 1
@@ -0,0 +1,125 @@
+from utils.testing import league_entry
+
+
+def _get_api_dicts(n: int, prefix: str):
+    return [league_entry(f"{prefix}_{i}", league_points=i) for i in range(n)]
+
+
+def test_sharded_buffer_routes_by_server():
+    """
+    Test that each server's data ends up in its own shard, and that the merged view combines them.
+    """
+    from .session.shard_router import ShardRouter
+    from .session.session_handler import SessionCreator, session_scope
+    from .tables.player import Player
+    from ..data_buffers import ShardedDatabaseBuffer
+    from utils.enums import Server
+    import tempfile
+    import os
+    import csv
+
+    with tempfile.TemporaryDirectory() as directory:
+        router = ShardRouter(connection_template=f"sqlite:///{directory}/players_{{server}}.db")
+        with ShardedDatabaseBuffer(TableInstance=Player, router=router, batch_size=4) as buffer:
+            buffer.add(_get_api_dicts(5, "euw"), server=Server.EUW)
+            buffer.add(_get_api_dicts(3, "na"), server=Server.NA)
+        assert os.path.exists(os.path.join(directory, "players_euw.db"))
+        assert os.path.exists(os.path.join(directory, "players_na.db"))
+
+        with router.session_scope(Server.EUW) as session:
+            assert session.query(Player).count() == 5
+        with router.session_scope(Server.NA) as session:
+            assert session.query(Player).count() == 3
+
+        rows = list(router.merged_rows(Player))
+        assert len(rows) == 8
+        assert {r["server"] for r in rows} == {Server.EUW, Server.NA}
+
+        path = os.path.join(directory, "players.csv")
+        assert router.export_csv(path, Player) == 8
+        with open(path) as f:
+            assert {r["server"] for r in csv.DictReader(f)} == {"EUW1", "NA1"}
+
+        target = SessionCreator(db_string=f"sqlite:///{directory}/merged.db")
+        assert router.merge_into(Player, target=target, batch_size=3) == 8
+        with session_scope(target) as session:
+            assert session.query(Player).filter(Player.server == Server.NA).count() == 3
+
+
+def test_merged_view_finds_existing_shards():
+    """
+    Test that a fresh router reads the shards created before, without creating any new shard.
+    """
+    from .session.shard_router import ShardRouter
+    from .tables.player import Player
+    from ..data_buffers import ShardedDatabaseBuffer
+    from utils.enums import Server
+    import tempfile
+    import os
+    import csv
+
+    with tempfile.TemporaryDirectory() as directory:
+        template = f"sqlite:///{directory}/players_{{server}}.db"
+        path = os.path.join(directory, "players.csv")
+        # no shards yet > empty export, but with header
+        assert ShardRouter(connection_template=template).export_csv(path, Player) == 0
+        with open(path) as f:
+            assert "summoner_id" in next(csv.reader(f))
+        assert os.listdir(directory) == ["players.csv"]
+
+        with ShardedDatabaseBuffer(
+            TableInstance=Player, router=ShardRouter(connection_template=template), batch_size=4
+        ) as buffer:
+            buffer.add(_get_api_dicts(5, "euw"), server=Server.EUW)
+            buffer.add(_get_api_dicts(3, "kr"), server=Server.KR)
+
+        router = ShardRouter(connection_template=template)
+        assert router.existing_servers() == (Server.EUW, Server.KR)
+        assert router.export_csv(path, Player) == 8
+        assert router.export_csv(path, Player, servers=[Server.NA, Server.KR]) == 3
+        assert sorted(os.listdir(directory)) == ["players.csv", "players_euw.db", "players_kr.db"]
+        assert ShardRouter(connection_template=template, servers=[Server.KR]).existing_servers() == (Server.KR,)
+
+
+def test_shards_are_written_in_parallel():
+    """
+    Test that every shard is saved by its own writer thread (not by the thread adding the data),
+    and that a failing shard is raised without losing the other shards.
+    """
+    from .session.shard_router import ShardRouter
+    from .tables.player import Player
+    from ..data_buffers import ShardedDatabaseBuffer
+    from utils.enums import Server
+    import threading
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        router = ShardRouter(connection_template=f"sqlite:///{directory}/players_{{server}}.db")
+        saved_by = set()
+        with ShardedDatabaseBuffer(TableInstance=Player, router=router, batch_size=2) as buffer:
+            for server in (Server.EUW, Server.NA):
+                shard_buffer = buffer.buffer_for(server)
+                save = shard_buffer.save
+
+                def _save(save=save):
+                    saved_by.add(threading.current_thread().name)
+                    save()
+
+                shard_buffer.save = _save
+            buffer.add(_get_api_dicts(5, "euw"), server=Server.EUW)
+            buffer.add(_get_api_dicts(3, "na"), server=Server.NA)
+        assert saved_by == {"shard-writer-EUW", "shard-writer-NA"}
+        with router.session_scope(Server.NA) as session:
+            assert session.query(Player).count() == 3
+
+        try:
+            with ShardedDatabaseBuffer(TableInstance=Player, router=router) as buffer:
+                # the same summoner twice > unique constraint of the EUW shard
+                duplicates = [dict(entry, server=Server.EUW) for entry in _get_api_dicts(1, "euw") * 2]
+                buffer.add(duplicates, server=Server.EUW)
+                buffer.add(_get_api_dicts(2, "kr"), server=Server.KR)
+            assert False, "the error of the EUW writer must be raised"
+        except Exception as e:
+            assert "UNIQUE" in str(e)
+        with router.session_scope(Server.KR) as session:
+            assert session.query(Player).count() == 2
@@ -0,0 +1,221 @@
+from typing import Optional, List, Dict, Any, Generator, Iterable
+import datetime
+import glob
+import gzip
+import io
+import csv
+import json
+import os
+import threading
+from sqlalchemy import inspect
+from .database_orm import bot_declarative_base
+from .database_orm.session.session_handler import session_scope, SessionCreator
+from .database_orm.tables.player import Player
+from .data_buffers import DuplicateFilter
+from utils.enums import Tier, Division, RankedQueue, Server
+
+_SEGMENT_PREFIX = "pages-"
+_SEGMENT_SUFFIX = ".ndjson.gz"
+
+
+class RawPageLog:
+    """
+    Append-only landing zone for raw `GET getLeagueEntries` responses.
+    Every page is written as one JSON line (with its request parameters & fetch timestamp)
+    into gzip-compressed segments, which are rotated after [max_pages_per_segment] pages.
+    Existing segments are never re-opened, a new log instance always starts a new segment.
+    Meant to be passed to `EntryFetcher(page_log=...)`, and to be used as a context manager.
+
+    Args:
+        directory (str): directory the segments are written to (created if missing).
+        max_pages_per_segment (int, optional): pages per segment before rotating. Defaults to 10_000.
+    """
+
+    def __init__(self, directory: str, max_pages_per_segment: Optional[int] = 10_000) -> None:
+        self.directory = directory
+        self.max_pages_per_segment = max_pages_per_segment
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        self._next_segment_no = (
+            int(os.path.basename(existing[-1])[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)]) + 1
+            if existing
+            else 0
+        )
+        self._segment = None
+        self._pages_in_segment = 0
+        self._lock = threading.Lock()
+
+    def _rotate(self) -> None:
+        """
+        Closes the current segment (if any) and opens the next one.
+        """
+        self.close()
+        path = os.path.join(
+            self.directory, f"{_SEGMENT_PREFIX}{self._next_segment_no:06d}{_SEGMENT_SUFFIX}"
+        )
+        self._segment = gzip.open(path, "xt", encoding="utf-8")
+        self._next_segment_no += 1
+        self._pages_in_segment = 0
+
+    def write_page(
+        self,
+        server: Server,
+        ranked_queue: RankedQueue,
+        tier: Tier,
+        division: Division,
+        page: int,
+        entries: List[Dict[str, Any]],
+        fetched_at: Optional[datetime.datetime] = None,
+        kept: Optional[List[int]] = None,
+    ) -> None:
+        """
+        Appends a raw page (as returned by the API) with its request parameters.
+        [kept] are the indices of the entries the crawl kept (e.g. `max_entries` or sampling), None if all.
+        Thread-safe, so concurrent fetchers can share a log.
+        """
+        line = json.dumps(
+            {
+                "server": server.value,
+                "queue": ranked_queue.value,
+                "tier": tier.value,
+                "division": division.value,
+                "page": page,
+                "fetched_at": (fetched_at or datetime.datetime.utcnow()).isoformat(),
+                "entries": entries,
+                "kept": kept,
+            }
+        )
+        with self._lock:
+            if self._segment is None or self._pages_in_segment >= self.max_pages_per_segment:
+                self._rotate()
+            self._segment.write(line + "\n")
+            self._pages_in_segment += 1
+
+    def close(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> Optional[bool]:
+        # whatever was fetched is persisted, even when exiting because of an error
+        self.close()
+        return False if exc_type else None
+
+
+def segment_paths(directory: str) -> List[str]:
+    """
+    Returns:
+        List[str]: paths of all segments in [directory], in the order they were written.
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}")))
+
+
+def read_pages(paths: Iterable[str]) -> Generator[Dict[str, Any], None, None]:
+    """
+    Replays logged pages from segments.
+    A truncated last line (e.g. a crashed writer) ends the replay of that segment.
+
+    Yields:
+        Generator[Dict[str, Any], None, None]: one logged page (request parameters + `entries`) at a time.
+    """
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as segment:
+            try:
+                for line in segment:
+                    yield json.loads(line)
+            except (EOFError, json.JSONDecodeError):
+                continue
+
+
+def _rows(
+    pages: Iterable[Dict[str, Any]], TableInstance: bot_declarative_base
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Converts logged pages into {column: value} rows of [TableInstance].
+    Only the entries the crawl kept are replayed, and every (server, queue, summoner) only once
+    (a summoner can be logged on several pages, or by several runs).
+    """
+    unseen = DuplicateFilter()
+    for page in pages:
+        server = Server(page["server"])
+        entries = page["entries"]
+        if page.get("kept") is not None:
+            entries = [entries[i] for i in page["kept"]]
+        for entry in unseen(entries, server=server):
+            row = TableInstance._api_dict_to_fields(entry)
+            row["server"] = server
+            yield row
+
+
+def _copy_into_postgres(session, TableInstance: bot_declarative_base, rows: List[Dict[str, Any]]) -> None:
+    """
+    Loads rows with a single `COPY ... FROM STDIN` (postgres / psycopg2 only).
+    Values are converted by the column types' bind processors, so enums are stored exactly as the ORM would.
+    """
+    table = TableInstance.__table__
+    dialect = session.bind.dialect
+    columns = [table.c[key] for key in rows[0]]
+    processors = [c.type.bind_processor(dialect) for c in columns]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = []
+        for column, process in zip(columns, processors):
+            value = row[column.key]
+            value = process(value) if process is not None else value
+            values.append("" if value is None else value)
+        writer.writerow(values)
+    buffer.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    column_names = ", ".join(f'"{c.name}"' for c in columns)
+    cursor.copy_expert(f'COPY "{table.name}" ({column_names}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def bulk_load(
+    directory: str,
+    TableInstance: Optional[bot_declarative_base] = Player,
+    session_creator: Optional[SessionCreator] = None,
+    batch_size: Optional[int] = 50_000,
+) -> int:
+    """
+    Replays all segments of a raw page log into [TableInstance], without spending any API budget
+    (e.g. to rebuild tables after a schema change).
+    Uses the fastest path the dialect supports: `COPY` on postgres, batched `executemany` inserts elsewhere.
+
+    Args:
+        directory (str): directory of the raw page log.
+        TableInstance (Optional[bot_declarative_base], optional): `Player` or `CompactPlayer`. Defaults to Player.
+        session_creator (Optional[SessionCreator], optional): DB to load into. Defaults to None (environment-configured DB).
+        batch_size (Optional[int], optional): rows per `COPY` / `executemany`. Defaults to 50_000.
+
+    Returns:
+        int: amount of loaded rows.
+    """
+    n_rows = 0
+    with session_scope(session_creator) as session:
+        use_copy = session.bind.dialect.name == "postgresql" and session.bind.dialect.driver == "psycopg2"
+        table = inspect(TableInstance).local_table
+        batch = []
+
+        def _flush():
+            if not batch:
+                return
+            if use_copy:
+                _copy_into_postgres(session, TableInstance, batch)
+            else:
+                session.execute(table.insert(), batch)
+
+        for row in _rows(read_pages(segment_paths(directory)), TableInstance):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _flush()
+                n_rows += len(batch)
+                batch = []
+        _flush()
+        n_rows += len(batch)
+    return n_rows
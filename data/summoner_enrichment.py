@@ -0,0 +1,199 @@
+from typing import Optional, Dict, List, Iterable, Tuple, Any
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import queue
+from sqlalchemy import and_, or_
+from .database_orm.session.session_handler import session_scope, SessionCreator
+from .database_orm.tables.player import Player
+from .database_orm.tables.summoner import Summoner
+from api_interface.clock import Clock, system_clock
+from api_interface.rate_limiters import RateLimiterCollection
+from api_interface.resilience import Backoff, is_retriable, _retry_after
+from utils.enums import Server
+
+EnrichmentReport = namedtuple("EnrichmentReport", ("n_pending", "n_fetched", "n_failed"))
+
+# marks the end of a worker's results
+_WORKER_DONE = object()
+
+
+class SummonerEnricher:
+    """
+    Pipeline stage that enriches `Player` rows with `summoner-v4` data (PUUID, account ID, summoner level).
+        > reads the (server, summoner_id) pairs of `Player` missing from the `Summoner` cache (or older than [ttl]),
+          deduplicated, since a summoner can be ranked in several queues,
+        > fetches them concurrently, one worker per server, each with its own copy of the rate limiters,
+        > writes the results back into the `Summoner` table in batches of [batch_size] from a single writer.
+    Retriable errors (429, 5xx, timeouts) are retried with jittered backoff (or the `Retry-After` the API asks for).
+    Summoners that are not found (e.g. deleted) or exhaust their retries are skipped, and retried on the next run.
+
+    Args:
+        lolwatcher (LolWatcher): Instantiated lolwatcher.
+        rate_limiters (RateLimiterCollection): limiter configuration, copied for every server.
+        ttl (Optional[datetime.timedelta], optional): age after which a cached summoner is refetched. Defaults to 30 days.
+        session_creator (Optional[SessionCreator], optional): DB to work on. Defaults to None (environment-configured DB).
+        batch_size (Optional[int], optional): summoners written per transaction. Defaults to 1_000.
+        clock (Optional[Clock], optional): source of the current time. Defaults to None (system clock).
+        backoff (Optional[Backoff], optional): retry delays. Defaults to None (`Backoff()`).
+        max_retries (Optional[int], optional): retry budget of a single summoner. Defaults to 5.
+    """
+
+    def __init__(
+        self,
+        lolwatcher,
+        rate_limiters: RateLimiterCollection,
+        ttl: Optional[datetime.timedelta] = datetime.timedelta(days=30),
+        session_creator: Optional[SessionCreator] = None,
+        batch_size: Optional[int] = 1_000,
+        clock: Optional[Clock] = None,
+        backoff: Optional[Backoff] = None,
+        max_retries: Optional[int] = 5,
+    ) -> None:
+        self.lolwatcher = lolwatcher
+        self.rate_limiters = rate_limiters
+        self.ttl = ttl
+        self.session_creator = session_creator
+        self.batch_size = batch_size
+        self.clock = clock or system_clock
+        self.backoff = backoff or Backoff()
+        self.max_retries = max_retries
+
+    def pending(
+        self, servers: Optional[Iterable[Server]] = None, limit: Optional[int] = None
+    ) -> Dict[Server, List[str]]:
+        """
+        Deduplicated summoner IDs of `Player` rows that are not (freshly) cached.
+
+        Args:
+            servers (Optional[Iterable[Server]], optional): only look at these servers. Defaults to None (all).
+            limit (Optional[int], optional): maximum amount of summoners. Defaults to None (no limit).
+
+        Returns:
+            Dict[Server, List[str]]: {server: [summoner_id, ...]}
+        """
+        stale_before = self.clock.now() - self.ttl
+        with session_scope(self.session_creator) as session:
+            query = (
+                session.query(Player.server, Player.summoner_id)
+                .outerjoin(
+                    Summoner,
+                    and_(
+                        Summoner.server == Player.server,
+                        Summoner.summoner_id == Player.summoner_id,
+                    ),
+                )
+                .filter(
+                    Player.server.isnot(None),
+                    Player.summoner_id.isnot(None),
+                    or_(Summoner.id.is_(None), Summoner.fetched_at < stale_before),
+                )
+                .distinct()
+            )
+            if servers is not None:
+                query = query.filter(Player.server.in_(list(servers)))
+            if limit is not None:
+                query = query.limit(limit)
+
+            pending = {}
+            for server, summoner_id in query:
+                pending.setdefault(server, []).append(summoner_id)
+        return pending
+
+    def _fetch_server(
+        self, server: Server, summoner_ids: List[str], results: queue.Queue
+    ) -> None:
+        """
+        Worker: fetches all [summoner_ids] of one server under its own rate limiters.
+        """
+        rate_limiters = self.rate_limiters.copy()
+        try:
+            for summoner_id in summoner_ids:
+                attempt = 0
+                while True:
+                    rate_limiters.wait()
+                    try:
+                        summoner_DTO = self.lolwatcher.summoner.by_id(
+                            region=server.value, encrypted_summoner_id=summoner_id
+                        )
+                    except Exception as e:
+                        if is_retriable(e) and attempt < self.max_retries:
+                            self.clock.sleep(max(self.backoff.delay(attempt), _retry_after(e)))
+                            attempt += 1
+                            continue
+                        response = getattr(e, "response", None)
+                        if is_retriable(e) or getattr(response, "status_code", None) == 404:
+                            summoner_DTO = None
+                        else:
+                            raise
+                    break
+                results.put((server, summoner_id, summoner_DTO))
+        finally:
+            results.put(_WORKER_DONE)
+
+    def _save(self, batch: List[Tuple[Server, str, Dict[str, Any]]]) -> None:
+        """
+        Replaces the cached entries of a batch of fetched summoners.
+        """
+        fetched_at = self.clock.now()
+        rows = []
+        for server, summoner_id, summoner_DTO in batch:
+            row = Summoner._api_dict_to_fields(summoner_DTO)
+            row.update(server=server, summoner_id=summoner_id, fetched_at=fetched_at)
+            rows.append(row)
+
+        with session_scope(self.session_creator) as session:
+            by_server = {}
+            for row in rows:
+                by_server.setdefault(row["server"], []).append(row["summoner_id"])
+            for server, summoner_ids in by_server.items():
+                session.query(Summoner).filter(
+                    Summoner.server == server, Summoner.summoner_id.in_(summoner_ids)
+                ).delete(synchronize_session=False)
+            session.bulk_insert_mappings(Summoner, rows)
+
+    def run(
+        self, servers: Optional[Iterable[Server]] = None, limit: Optional[int] = None
+    ) -> EnrichmentReport:
+        """
+        Runs the stage once.
+
+        Args:
+            servers (Optional[Iterable[Server]], optional): only enrich these servers. Defaults to None (all).
+            limit (Optional[int], optional): maximum amount of summoners to enrich. Defaults to None (no limit).
+
+        Returns:
+            EnrichmentReport: (n_pending, n_fetched, n_failed)
+        """
+        pending = self.pending(servers=servers, limit=limit)
+        n_pending = sum(len(ids) for ids in pending.values())
+        if not pending:
+            return EnrichmentReport(n_pending=0, n_fetched=0, n_failed=0)
+
+        results = queue.Queue()
+        n_fetched, n_failed, batch = 0, 0, []
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [
+                executor.submit(self._fetch_server, server, summoner_ids, results)
+                for server, summoner_ids in pending.items()
+            ]
+            n_running = len(futures)
+            while n_running:
+                result = results.get()
+                if result is _WORKER_DONE:
+                    n_running -= 1
+                    continue
+                if result[2] is None:
+                    n_failed += 1
+                    continue
+                batch.append(result)
+                if len(batch) >= self.batch_size:
+                    self._save(batch)
+                    n_fetched, batch = n_fetched + len(batch), []
+            # propagate unexpected errors of the workers
+            for future in futures:
+                future.result()
+        if batch:
+            self._save(batch)
+            n_fetched += len(batch)
+        return EnrichmentReport(n_pending=n_pending, n_fetched=n_fetched, n_failed=n_failed)
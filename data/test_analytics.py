@@ -0,0 +1,135 @@
+def _get_arrays():
+    """
+    A small, hand-countable columnar dataset.
+    """
+    from .analytics import from_columns
+    from utils.enums import Server, RankedQueue, Tier, Division
+
+    return from_columns(
+        {
+            "server": [Server.EUW, Server.EUW, Server.EUW, Server.NA],
+            "ranked_queue": [RankedQueue.SOLO_DUO] * 4,
+            # raw API values are accepted as well as enum members
+            "tier": ["GOLD", "GOLD", Tier.IRON, Tier.GOLD],
+            "division": [Division.FOUR, Division.FOUR, "I", Division.ONE],
+            "league_points": [0, 55, 99, 100],
+            "wins": [10, 5, 0, 0],
+            "losses": [10, 15, 0, 1],
+        }
+    )
+
+
+def test_distributions_from_columns():
+    """
+    Test that observed ranked & server distributions are computed correctly.
+    """
+    from .analytics import ranked_distributions, ranked_distributions_per_server, server_distribution
+    from utils.enums import Server, Tier, Division
+
+    arrays = _get_arrays()
+    observed = {d.tier: d for d in ranked_distributions(arrays)}
+    assert observed[Tier.GOLD].distribution[Division.FOUR] == 0.5
+    assert observed[Tier.GOLD].distribution[Division.ONE] == 0.25
+    assert observed[Tier.IRON].distribution[Division.ONE] == 0.25
+    assert sum(d.total for d in observed.values()) == 1.0
+
+    per_server = ranked_distributions_per_server(arrays)
+    assert set(per_server) == {Server.EUW, Server.NA}
+    euw = {d.tier: d for d in per_server[Server.EUW]}
+    assert abs(euw[Tier.GOLD].distribution[Division.FOUR] - 2 / 3) < 1e-9
+
+    servers = server_distribution(arrays)
+    assert servers.EUW == 0.75 and servers.NA == 0.25 and servers.KR == 0.0
+
+
+def test_histograms_and_drift():
+    """
+    Test histograms and drift against the static distributions.
+    """
+    from .analytics import (
+        win_rate_histogram,
+        lp_histogram,
+        ranked_distributions,
+        ranked_drift,
+        server_distribution,
+        server_drift,
+    )
+    from utils.distributions.server_distributions import TotalDistribution
+    from utils.enums import Server, Tier, Division
+
+    arrays = _get_arrays()
+    counts, edges = win_rate_histogram(arrays, bins=4)
+    # player without games is excluded, win-rates: 0.5, 0.25, 0.0
+    assert counts.tolist() == [1, 1, 1, 0]
+    assert edges[0] == 0.0 and edges[-1] == 1.0
+    counts, _ = lp_histogram(arrays, bins=2)
+    assert counts.tolist() == [1, 3]
+
+    drift = ranked_drift(ranked_distributions(arrays))
+    assert drift[Tier.DIAMOND][Division.ONE] < 0
+    assert drift[Tier.GOLD][Division.FOUR] > 0
+    assert server_drift(server_distribution(arrays))[Server.EUW] == 0.75 - TotalDistribution.EUW
+
+
+def test_columnar_dump_roundtrip():
+    """
+    Test that a columnar dump can be written and read back.
+    """
+    from .analytics import dump_player_arrays, load_player_arrays_dump
+    import tempfile
+    import os
+
+    arrays = _get_arrays()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "players.npz")
+        dump_player_arrays(arrays, path)
+        loaded = load_player_arrays_dump(path)
+    for original, restored in zip(arrays, loaded):
+        assert original.tolist() == restored.tolist()
+
+
+def test_load_rows_written_by_older_versions():
+    """
+    Test that rows without server, wins, losses or LP (older pipeline) load, and are left out where needed.
+    """
+    from .analytics import (
+        MISSING,
+        load_player_arrays,
+        ranked_distributions,
+        server_distribution,
+        win_rate_histogram,
+        lp_histogram,
+    )
+    from .database_orm.session.session_handler import SessionCreator, session_scope
+    from .database_orm.tables.player import Player
+    from utils.enums import Server, RankedQueue, Tier, Division
+
+    creator = SessionCreator(db_string="sqlite://")
+    with session_scope(creator) as session:
+        session.add_all(
+            [
+                # older pipeline: no server, wins & losses
+                Player(ranked_queue=RankedQueue.SOLO_DUO, tier=Tier.GOLD, division=Division.ONE, league_points=50),
+                Player(ranked_queue=RankedQueue.SOLO_DUO, tier=Tier.GOLD, division=Division.TWO),
+                # cannot be placed in any cell
+                Player(ranked_queue=RankedQueue.SOLO_DUO, tier=None, division=Division.TWO),
+                Player(
+                    server=Server.EUW,
+                    ranked_queue=RankedQueue.SOLO_DUO,
+                    tier=Tier.GOLD,
+                    division=Division.ONE,
+                    league_points=10,
+                    wins=3,
+                    losses=1,
+                ),
+            ]
+        )
+
+    arrays = load_player_arrays(session_creator=creator, chunk_size=2)
+    assert len(arrays.tier) == 3
+    assert arrays.server.tolist().count(MISSING) == 2
+    assert {d.tier: d for d in ranked_distributions(arrays)}[Tier.GOLD].total == 1.0
+    servers = server_distribution(arrays)
+    assert servers.EUW == 1.0
+    assert win_rate_histogram(arrays, bins=4)[0].tolist() == [0, 0, 0, 1]
+    assert lp_histogram(arrays, bins=2)[0].tolist() == [1, 1]
@@ -0,0 +1,94 @@
+from utils.testing import fake_lolwatcher
+
+
+def test_pages_are_logged_and_bulk_loaded():
+    """
+    Test that raw pages are logged (with rotation) before conversion, and can be replayed into a table.
+    """
+    from .raw_page_log import RawPageLog, segment_paths, read_pages, bulk_load
+    from .data_buffers import DatabaseBuffer
+    from .database_orm.session.session_handler import SessionCreator, session_scope
+    from .database_orm.tables.player import Player
+    from .database_orm.tables.compact_player import CompactPlayer
+    from api_interface.league_entries import EntryFetcher
+    from utils.enums import Tier, Division, RankedQueue, Server
+    import tempfile
+    import os
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_directory = os.path.join(directory, "raw")
+        db = SessionCreator(db_string=f"sqlite:///{directory}/players.db")
+        with RawPageLog(log_directory, max_pages_per_segment=2) as page_log:
+            ef = EntryFetcher(
+                lolwatcher=fake_lolwatcher(n_entries=30, page_size=7)[0],
+                tier=Tier.GOLD,
+                division=Division.FOUR,
+                ranked_queue=RankedQueue.SOLO_DUO,
+                server=Server.EUW,
+                max_entries=30,
+                page_log=page_log,
+            )
+            with DatabaseBuffer(TableInstance=Player, session_creator=db, batch_size=10) as buffer:
+                for entries in ef:
+                    # conversion mutates the entries, the log must be unaffected
+                    buffer.add(entries)
+
+        # 5 pages (7 + 7 + 7 + 7 + 2 entries) in segments of 2 pages
+        assert len(segment_paths(log_directory)) == 3
+        pages = list(read_pages(segment_paths(log_directory)))
+        assert [p["page"] for p in pages] == [1, 2, 3, 4, 5]
+        assert pages[0]["server"] == "EUW1" and pages[0]["tier"] == "GOLD"
+        assert pages[0]["entries"][0]["summonerId"] == "EUW1_0"
+        assert "fetched_at" in pages[0]
+
+        # a new log never appends to existing segments
+        with RawPageLog(log_directory) as page_log:
+            page_log.write_page(Server.NA, RankedQueue.SOLO_DUO, Tier.IRON, Division.ONE, 1, [])
+        assert len(segment_paths(log_directory)) == 4
+
+        assert bulk_load(log_directory, TableInstance=CompactPlayer, session_creator=db, batch_size=4) == 30
+        with session_scope(db) as session:
+            assert session.query(Player).count() == 30
+            loaded = session.query(CompactPlayer).order_by(CompactPlayer.rank_score.desc()).all()
+            assert len(loaded) == 30
+            assert {p.server for p in loaded} == {Server.EUW}
+            assert loaded[0].league_points == 29 and loaded[0].wins == 10
+
+
+def test_bulk_load_matches_the_crawl():
+    """
+    Test that the replay only loads the entries the crawl kept, and every summoner once (re-runs, overlapping pages).
+    """
+    from .raw_page_log import RawPageLog, bulk_load
+    from .database_orm.session.session_handler import SessionCreator, session_scope
+    from .database_orm.tables.player import Player
+    from api_interface.league_entries import EntryFetcher
+    from api_interface.sampling import SampledEntryFetcher
+    from utils.enums import Tier, Division, RankedQueue, Server
+    import tempfile
+
+    params = dict(
+        lolwatcher=fake_lolwatcher(n_entries=30, page_size=7)[0],
+        tier=Tier.GOLD,
+        division=Division.FOUR,
+        ranked_queue=RankedQueue.SOLO_DUO,
+        server=Server.EUW,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        # the same crawl twice into the same log, truncated within the 2nd page
+        for _ in range(2):
+            with RawPageLog(directory) as page_log:
+                ef = EntryFetcher(**params, max_entries=10, page_log=page_log)
+                crawled = [e["summonerId"] for page in ef for e in page]
+        with RawPageLog(directory) as page_log:
+            ef = SampledEntryFetcher(**params, page_log=page_log, page_quotas={2: 3, 4: 2}, seed=1)
+            sampled = [e["summonerId"] for page in ef for e in page]
+            # a summoner logged again on another page
+            first_entry = ef.fetch_next_page(page=1)[:1]
+            page_log.write_page(Server.EUW, RankedQueue.SOLO_DUO, Tier.GOLD, Division.FOUR, 6, first_entry)
+
+        db = SessionCreator(db_string="sqlite://")
+        expected = set(crawled) | set(sampled)
+        assert bulk_load(directory, session_creator=db) == len(expected)
+        with session_scope(db) as session:
+            assert {p.summoner_id for p in session.query(Player)} == expected
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+from utils.testing import http_error
+
+
+def _fake_lolwatcher(missing_ids=(), failures=None):
+    """
+    LolWatcher stand-in for `summoner.by_id`, recording every request.
+    Summoners in `missing_ids` respond with a 404, `failures` maps a summoner to the amount of requests that
+    fail (with a 503, asking to retry after 7 seconds) before it is found.
+    """
+    requested = []
+    failures = dict(failures or {})
+
+    def by_id(region, encrypted_summoner_id):
+        requested.append((region, encrypted_summoner_id))
+        if encrypted_summoner_id in missing_ids:
+            raise http_error(404)
+        if failures.get(encrypted_summoner_id, 0):
+            failures[encrypted_summoner_id] -= 1
+            error = http_error(503)
+            error.response.headers["Retry-After"] = "7"
+            raise error
+        return {
+            "id": encrypted_summoner_id,
+            "accountId": f"account_{encrypted_summoner_id}",
+            "puuid": f"puuid_{encrypted_summoner_id}",
+            "name": "name",
+            "summonerLevel": 30,
+        }
+
+    return SimpleNamespace(summoner=SimpleNamespace(by_id=by_id)), requested
+
+
+def test_enrichment_dedupes_and_caches():
+    """
+    Test that every summoner is fetched once, results are cached, and stale entries are refetched.
+    """
+    from .summoner_enrichment import SummonerEnricher
+    from .database_orm.session.session_handler import SessionCreator, session_scope
+    from .database_orm.tables.player import Player
+    from .database_orm.tables.summoner import Summoner
+    from api_interface.clock import VirtualClock
+    from api_interface.rate_limiters import RateLimiterCollection, RateLimiter
+    from utils.enums import Server, RankedQueue
+    import datetime
+
+    db = SessionCreator(db_string="sqlite://")
+    with session_scope(db) as session:
+        for server, n in ((Server.EUW, 5), (Server.NA, 3)):
+            for queue in (RankedQueue.SOLO_DUO, RankedQueue.FLEX_SR):
+                # the same summoners are ranked in two queues
+                session.add_all(
+                    [Player(server=server, ranked_queue=queue, summoner_id=f"s{i}") for i in range(n)]
+                )
+
+    clock = VirtualClock()
+    lolwatcher, requested = _fake_lolwatcher(missing_ids={"s4"})
+    enricher = SummonerEnricher(
+        lolwatcher=lolwatcher,
+        rate_limiters=RateLimiterCollection(
+            rate_limiters=(RateLimiter(n_requests=10, per_interval="1seconds"),), clock=clock
+        ),
+        ttl=datetime.timedelta(days=1),
+        session_creator=db,
+        batch_size=2,
+        clock=clock,
+    )
+    report = enricher.run()
+    assert (report.n_pending, report.n_fetched, report.n_failed) == (8, 7, 1)
+    assert len(requested) == len(set(requested)) == 8
+    with session_scope(db) as session:
+        summoner = session.query(Summoner).filter_by(server=Server.NA, summoner_id="s2").one()
+        assert summoner.puuid == "puuid_s2" and summoner.summoner_level == 30
+
+    # cached summoners are not requested again, failed ones are retried
+    assert enricher.run().n_pending == 1
+    clock.advance(2 * 24 * 60 * 60)
+    assert enricher.run().n_fetched == 7
+    with session_scope(db) as session:
+        assert session.query(Summoner).count() == 7
+
+
+def test_enrichment_retries_transient_errors():
+    """
+    Test that retriable errors are retried (respecting `Retry-After`) until the retry budget is exhausted.
+    """
+    from .summoner_enrichment import SummonerEnricher
+    from .database_orm.session.session_handler import SessionCreator, session_scope
+    from .database_orm.tables.player import Player
+    from api_interface.clock import VirtualClock
+    from api_interface.rate_limiters import RateLimiterCollection, RateLimiter
+    from api_interface.resilience import Backoff
+    from utils.enums import Server, RankedQueue
+
+    db = SessionCreator(db_string="sqlite://")
+    with session_scope(db) as session:
+        session.add_all(
+            [Player(server=Server.KR, ranked_queue=RankedQueue.SOLO_DUO, summoner_id=f"s{i}") for i in range(3)]
+        )
+
+    clock = VirtualClock()
+    lolwatcher, requested = _fake_lolwatcher(failures={"s1": 2, "s2": 10})
+    enricher = SummonerEnricher(
+        lolwatcher=lolwatcher,
+        rate_limiters=RateLimiterCollection(
+            rate_limiters=(RateLimiter(n_requests=10, per_interval="1seconds"),), clock=clock
+        ),
+        session_creator=db,
+        clock=clock,
+        backoff=Backoff(seed=0),
+        max_retries=3,
+    )
+    report = enricher.run()
+    assert (report.n_pending, report.n_fetched, report.n_failed) == (3, 2, 1)
+    # s1: 2 failures + success, s2: 1 try + 3 retries
+    assert [summoner_id for _, summoner_id in requested].count("s1") == 3
+    assert [summoner_id for _, summoner_id in requested].count("s2") == 4
+    assert clock.elapsed >= 5 * 7
@@ -18,6 +18,10 @@ class ServerDistribution:
         for k, v in kwargs.items():
             setattr(self, k, v)
 
+    @property
+    def total_population(self) -> int:
+        return self._total_population
+
     def __str__(self) -> str:
         _fields = [s.name for s in Server if s.name in vars(self)]
         distributions = [f"{f}: {getattr(self, f):.2%}" for f in _fields]
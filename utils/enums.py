@@ -1,4 +1,5 @@
 import enum
+from typing import Type, Tuple
 
 
 class Server(enum.Enum):
@@ -58,4 +59,44 @@ class Division(enum.Enum):
     ONE = "I"
     TWO = "II"
     THREE = "III"
-    FOUR = "IV"
\ No newline at end of file
+    FOUR = "IV"
+
+
+_MEMBERS_CACHE = {}
+
+
+def _members(enum_cls: Type[enum.Enum]) -> Tuple[enum.Enum, ...]:
+    """
+    Members of an enum in definition order; the position of a member is its integer code.
+    """
+    if enum_cls not in _MEMBERS_CACHE:
+        _MEMBERS_CACHE[enum_cls] = tuple(enum_cls)
+    return _MEMBERS_CACHE[enum_cls]
+
+
+def enum_to_code(member: enum.Enum) -> int:
+    """
+    Maps an enum member to a compact integer code (its position in the enum definition).
+    > NOTE: codes are only stable as long as new members are appended to the end of an enum!
+
+    Args:
+        member (enum.Enum): e.g. Tier.GOLD
+
+    Returns:
+        int: integer code of the member, e.g. 5
+    """
+    return _members(type(member)).index(member)
+
+
+def code_to_enum(enum_cls: Type[enum.Enum], code: int) -> enum.Enum:
+    """
+    Inverse of `enum_to_code`.
+
+    Args:
+        enum_cls (Type[enum.Enum]): the enum to map to, e.g. Tier
+        code (int): integer code, e.g. 5
+
+    Returns:
+        enum.Enum: the enum member, e.g. Tier.GOLD
+    """
+    return _members(enum_cls)[code]
@@ -0,0 +1,221 @@
+from typing import Optional, Dict, Callable, List
+from contextlib import contextmanager
+import atexit
+import cProfile
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+_PROFILE_ENV_NAME = "RIOT_DATA_DUMP_PROFILE"
+_PROFILE_OUTPUT_ENV_NAME = "RIOT_DATA_DUMP_PROFILE_OUTPUT"
+
+
+class StageStats:
+    """
+    Accumulated measurements of a single pipeline stage.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        # net bytes / memory blocks still allocated after the stage & highest traced memory growth within one call
+        self.allocated_bytes = 0
+        self.allocated_blocks = 0
+        self.peak_bytes = 0
+
+
+class _StageFrame:
+    """
+    Allocation state of a running stage.
+    """
+
+    def __init__(self) -> None:
+        self.memory_before = 0
+        self.blocks_before = 0
+        # highest traced memory reached by nested stages (they reset the tracemalloc peak)
+        self.nested_peak = 0
+
+
+class Profiler:
+    """
+    Opt-in per-stage profiling of the pipeline (fetching, limiter waits, conversion, buffering, saving).
+    Collects wall & CPU time per stage and, via `tracemalloc`, the memory allocated by each stage.
+    Optionally also runs `cProfile` over the whole run, whose output (`.prof`, pstats format)
+    can be turned into a flamegraph with e.g. `flameprof` or `snakeviz`.
+
+    Stages can be nested (e.g. `save` runs within `add`), so their times are inclusive.
+    Allocations are measured per call as the growth of the traced memory (bytes, peak) and of the interpreter's
+    allocated blocks, i.e. what is still allocated after a stage. Both are counters of the whole process, so they are
+    only measured for stages of the main thread (the consumer of a crawl), and still include whatever the crawl's
+    worker threads allocate meanwhile. Stages of other threads (e.g. `fetch`) are only timed.
+    While disabled, instrumented code only pays for a single attribute lookup.
+    Enable it with `enable()`, the `--profile` CLI flag, or the `RIOT_DATA_DUMP_PROFILE` env variable.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stages: Dict[str, StageStats] = {}
+        self.report_path = None
+        self.cprofile_path = None
+        self._cprofile = None
+        self._trace_allocations = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._atexit_registered = False
+
+    def enable(
+        self,
+        report_path: Optional[str] = None,
+        cprofile_path: Optional[str] = None,
+        trace_allocations: Optional[bool] = True,
+        report_at_exit: Optional[bool] = True,
+    ) -> None:
+        """
+        Starts profiling.
+
+        Args:
+            report_path (Optional[str], optional): where to write the report. Defaults to None (stderr).
+            cprofile_path (Optional[str], optional): if provided, also runs cProfile and dumps its stats here.
+                Defaults to None.
+            trace_allocations (Optional[bool], optional): measure allocations with tracemalloc
+                (slows down the run noticeably). Defaults to True.
+            report_at_exit (Optional[bool], optional): write the report when the interpreter exits. Defaults to True.
+        """
+        self.report_path = report_path
+        self.cprofile_path = cprofile_path
+        self._trace_allocations = trace_allocations
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if report_at_exit and not self._atexit_registered:
+            atexit.register(self.finish)
+            self._atexit_registered = True
+        self.enabled = True
+
+    def finish(self) -> None:
+        """
+        Stops profiling and writes the report (and cProfile stats). Does nothing if not enabled.
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+        if self._trace_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        if self.report_path:
+            with open(self.report_path, "w") as f:
+                f.write(self.report())
+        else:
+            sys.stderr.write(self.report())
+
+    def reset(self) -> None:
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measures the enclosed block as (one call of) stage [name]. A no-op while disabled.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        trace = (
+            self._trace_allocations
+            and tracemalloc.is_tracing()
+            and threading.current_thread() is threading.main_thread()
+        )
+        if trace:
+            frames = self._frames()
+            frame = _StageFrame()
+            frame.blocks_before = sys.getallocatedblocks()
+            frame.memory_before, peak_before = tracemalloc.get_traced_memory()
+            if frames:
+                # keep the peak of the enclosing stage, before resetting it for this one
+                frames[-1].nested_peak = max(frames[-1].nested_peak, peak_before)
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            frames.append(frame)
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            if trace:
+                frames.pop()
+                memory_after, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame.nested_peak)
+                if frames:
+                    frames[-1].nested_peak = max(frames[-1].nested_peak, peak)
+                blocks = sys.getallocatedblocks() - frame.blocks_before
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats())
+                stats.calls += 1
+                stats.wall_seconds += wall
+                stats.cpu_seconds += cpu
+                if trace:
+                    stats.allocated_bytes += memory_after - frame.memory_before
+                    stats.allocated_blocks += blocks
+                    stats.peak_bytes = max(stats.peak_bytes, peak - frame.memory_before)
+
+    def _frames(self) -> List[_StageFrame]:
+        """
+        Running (nested) stages of the current thread.
+        """
+        if not hasattr(self._local, "frames"):
+            self._local.frames = []
+        return self._local.frames
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: table of all stages, sorted by wall time.
+        """
+        lines = [
+            "profile (stages may be nested, times are inclusive):",
+            f"{'stage':<16}{'calls':>10}{'wall [s]':>12}{'cpu [s]':>12}"
+            f"{'wall/call [ms]':>16}{'alloc [blocks]':>16}{'alloc [KiB]':>14}{'peak [KiB]':>12}",
+        ]
+        for name, stats in sorted(self.stages.items(), key=lambda i: -i[1].wall_seconds):
+            lines.append(
+                f"{name:<16}{stats.calls:>10,}{stats.wall_seconds:>12.3f}{stats.cpu_seconds:>12.3f}"
+                f"{1_000 * stats.wall_seconds / max(stats.calls, 1):>16.3f}{stats.allocated_blocks:>16,}"
+                f"{stats.allocated_bytes / 1024:>14,.1f}{stats.peak_bytes / 1024:>12,.1f}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instantiation
+profiler = Profiler()
+
+
+def profiled(name: str) -> Callable:
+    """
+    Decorator that measures every call of the decorated function as stage [name] (if profiling is enabled).
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+if os.environ.get(_PROFILE_ENV_NAME):
+    profiler.enable(report_path=os.environ.get(_PROFILE_OUTPUT_ENV_NAME))
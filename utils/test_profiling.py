@@ -0,0 +1,132 @@
+def test_profiler_collects_stages():
+    """
+    Test that enabled profiling measures stages, and disabled profiling measures nothing.
+    """
+    from .profiling import Profiler, profiled, profiler
+    import tempfile
+    import pstats
+    import os
+
+    @profiled("square")
+    def square(x):
+        return [i * i for i in range(x)]
+
+    square(10)
+    assert "square" not in profiler.stages
+
+    with tempfile.TemporaryDirectory() as directory:
+        report_path = os.path.join(directory, "report.txt")
+        cprofile_path = os.path.join(directory, "run.prof")
+        profiler.reset()
+        profiler.enable(report_path=report_path, cprofile_path=cprofile_path, report_at_exit=False)
+        try:
+            for _ in range(3):
+                square(10_000)
+            with profiler.stage("outer"):
+                square(10)
+        finally:
+            profiler.finish()
+
+        assert profiler.stages["square"].calls == 4
+        assert profiler.stages["outer"].calls == 1
+        assert profiler.stages["square"].wall_seconds >= profiler.stages["square"].cpu_seconds * 0.5
+        with open(report_path) as f:
+            report = f.read()
+        assert "square" in report and "outer" in report
+        # cProfile output is a regular pstats dump
+        assert pstats.Stats(cprofile_path).total_calls > 0
+
+    square(10)
+    assert profiler.stages["square"].calls == 4
+    profiler.reset()
+    assert isinstance(profiler, Profiler)
+
+
+def test_pipeline_stages_are_instrumented():
+    """
+    Test that buffering, conversion, saving & committing show up as stages.
+    """
+    from .profiling import profiler
+    from data.data_buffers import DatabaseBuffer
+    from data.database_orm.session.session_handler import SessionCreator
+    from data.database_orm.tables.player import Player
+    from .testing import league_entry
+
+    entries = [league_entry(str(i), league_points=i) for i in range(10)]
+    import tempfile
+    import os
+
+    profiler.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        profiler.enable(
+            report_path=os.path.join(directory, "report.txt"), trace_allocations=False, report_at_exit=False
+        )
+        try:
+            with DatabaseBuffer(
+                TableInstance=Player, session_creator=SessionCreator(db_string="sqlite://"), batch_size=4
+            ) as buffer:
+                buffer.add(entries)
+        finally:
+            profiler.finish()
+    assert profiler.stages["buffer_add"].calls == 1
+    assert profiler.stages["from_api_dict"].calls == 10
+    assert profiler.stages["save"].calls == 3
+    assert profiler.stages["commit"].calls >= 3
+    profiler.reset()
+
+
+def test_nested_stages_keep_outer_peak():
+    """
+    Test that a nested stage does not hide the peak memory of the enclosing stage, and that blocks are counted.
+    """
+    from .profiling import profiler
+    import tempfile
+    import os
+
+    profiler.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        profiler.enable(report_path=os.path.join(directory, "report.txt"), report_at_exit=False)
+        try:
+            with profiler.stage("outer"):
+                temporary = [object() for _ in range(50_000)]
+                del temporary
+                with profiler.stage("inner"):
+                    kept = [object() for _ in range(1_000)]
+        finally:
+            profiler.finish()
+        with open(os.path.join(directory, "report.txt")) as f:
+            assert "alloc [blocks]" in f.read()
+    outer, inner = profiler.stages["outer"], profiler.stages["inner"]
+    assert outer.peak_bytes > 20 * inner.peak_bytes
+    assert inner.allocated_blocks >= 1_000
+    assert outer.allocated_blocks >= inner.allocated_blocks
+    assert len(kept) == 1_000
+    profiler.reset()
+
+
+def test_only_main_thread_stages_trace_allocations():
+    """
+    Test that stages of worker threads are timed, but not attributed the (process-wide) allocations.
+    """
+    from .profiling import profiler
+    import threading
+    import os
+
+    def _work():
+        with profiler.stage("worker"):
+            return [object() for _ in range(10_000)]
+
+    profiler.reset()
+    profiler.enable(report_path=os.devnull, report_at_exit=False)
+    try:
+        worker = threading.Thread(target=_work)
+        worker.start()
+        worker.join()
+        _work()
+    finally:
+        profiler.finish()
+    stats = profiler.stages["worker"]
+    assert stats.calls == 2
+    # only the call of the main thread
+    assert 10_000 <= stats.allocated_blocks < 20_000
+    profiler.reset()
@@ -0,0 +1,76 @@
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from types import SimpleNamespace
+
+
+def league_entry(
+    summoner_id: str,
+    tier: Optional[str] = "GOLD",
+    rank: Optional[str] = "IV",
+    league_points: Optional[int] = 0,
+    queue_type: Optional[str] = "RANKED_SOLO_5x5",
+    **fields,
+) -> Dict[str, Any]:
+    """
+    A raw league entry, as returned by `GET getLeagueEntries` (for testing purposes only!).
+    [fields] are added to / override the entry's fields.
+    """
+    return {
+        "leagueId": "league",
+        "queueType": queue_type,
+        "tier": tier,
+        "rank": rank,
+        "summonerId": summoner_id,
+        "summonerName": f"name_{summoner_id}",
+        "leaguePoints": league_points,
+        "wins": 10,
+        "losses": 12,
+        "veteran": False,
+        "inactive": False,
+        "freshBlood": True,
+        "hotStreak": False,
+        **fields,
+    }
+
+
+def http_error(status_code: int):
+    """
+    A `requests.HTTPError` with [status_code], as raised by `LolWatcher` (for testing purposes only!).
+    """
+    import requests
+
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+def fake_lolwatcher(
+    n_entries: int, page_size: Optional[int] = 205, failures: Optional[Mapping[str, int]] = None
+) -> Tuple[SimpleNamespace, List[int]]:
+    """
+    LolWatcher stand-in whose `league.entries` serves [n_entries] league entries per region in pages of [page_size]
+    (for testing purposes only!). The i-th entry of a region is summoner "<region>_<i>" with i LP.
+
+    Args:
+        n_entries (int): amount of entries of every division.
+        page_size (Optional[int], optional): entries per page. Defaults to 205 (as the API).
+        failures (Optional[Mapping[str, int]], optional): {region: amount of requests that fail with a 503
+            before it recovers}. Defaults to None.
+
+    Returns:
+        Tuple[SimpleNamespace, List[int]]: the stand-in, and the pages it served (in request order).
+    """
+    failures = dict(failures or {})
+    requested_pages = []
+
+    def entries(region, queue, tier, division, page):
+        if failures.get(region, 0):
+            failures[region] -= 1
+            raise http_error(503)
+        requested_pages.append(page)
+        start = (page - 1) * page_size
+        return [
+            league_entry(f"{region}_{i}", tier=tier, rank=division, league_points=i, queue_type=queue)
+            for i in range(start, min(start + page_size, n_entries))
+        ]
+
+    return SimpleNamespace(league=SimpleNamespace(entries=entries)), requested_pages